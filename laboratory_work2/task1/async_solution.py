@@ -2,24 +2,28 @@ import asyncio
 import time
 import os
 
-async def calculate_sum(start, end):
-    return sum(range(start, end))
+from kernels import kernel_settings, reduce_range
+
+
+async def calculate_sum(start, end, kernel, func):
+    return reduce_range(start, end, kernel, func)
 
 async def main():
     target = int(os.getenv("TARGET", "1000000000"))
     num_tasks = 4
+    kernel, func = kernel_settings()
     chunk_size = target // num_tasks
     tasks = []
 
     for i in range(num_tasks):
         start = i * chunk_size + 1
         end = (i + 1) * chunk_size + 1
-        tasks.append(calculate_sum(start, end))
+        tasks.append(calculate_sum(start, end, kernel, func))
 
     start_time = time.time()
     results = await asyncio.gather(*tasks)
     total_sum = sum(results)
-    print(f"Количество задач: {num_tasks}")
+    print(f"Количество задач: {num_tasks}, ядро: {kernel}, функция: {func or 'x'}")
     print(f"Счёт до {target}")
     print(f"Общая сумма: {total_sum}")
     print(f"Время выполнения при помощи asyncio: {time.time() - start_time:.2f} секунд")
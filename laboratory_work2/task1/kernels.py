@@ -0,0 +1,65 @@
+import os
+
+NUMPY_CHUNK = int(os.getenv("NUMPY_CHUNK", 1_000_000))
+
+
+def sqrt(x):
+    return x ** 0.5
+
+
+def inverse(x):
+    return 1 / x
+
+
+# Функции подходят и для чисел, и для массивов numpy
+FUNCTIONS = {"sqrt": sqrt, "inverse": inverse}
+
+
+def python_kernel(start, end, func=None):
+    """Обычный цикл Python: держит GIL всё время счёта"""
+    numbers = range(start, end)
+    return sum(numbers) if func is None else sum(map(func, numbers))
+
+
+def numpy_kernel(start, end, func=None):
+    """Векторный счёт кусками по NUMPY_CHUNK: внутри numpy GIL отпускается"""
+    import numpy as np
+
+    total = 0
+    for chunk_start in range(start, end, NUMPY_CHUNK):
+        chunk = np.arange(chunk_start, min(chunk_start + NUMPY_CHUNK, end), dtype=np.int64)
+        # Сумму куска переводим в int Python, чтобы общий итог не переполнил int64
+        total += (chunk.sum() if func is None else func(chunk).sum()).item()
+    return total
+
+
+def closed_kernel(start, end, func=None):
+    """Сумма арифметической прогрессии за O(1); для произвольной функции не подходит"""
+    if func is not None:
+        raise ValueError("Ядро closed считает только сумму самих чисел")
+    count = max(0, end - start)
+    return (start + end - 1) * count // 2
+
+
+KERNELS = {"python": python_kernel, "numpy": numpy_kernel, "closed": closed_kernel}
+
+
+def reduce_range(start, end, kernel=None, func=None):
+    """Сумма func(i) по i из [start, end) выбранным ядром; без func - сумма самих чисел.
+
+    kernel и func передаются именами, чтобы задание можно было отдать в другой процесс.
+    """
+    kernel = kernel or os.getenv("KERNEL", "python")
+    if kernel not in KERNELS:
+        raise ValueError(f"Неизвестное ядро {kernel!r}, доступны: {', '.join(KERNELS)}")
+    if func and func not in FUNCTIONS:
+        raise ValueError(f"Неизвестная функция {func!r}, доступны: {', '.join(FUNCTIONS)}")
+    return KERNELS[kernel](start, end, FUNCTIONS[func] if func else None)
+
+
+def kernel_settings():
+    """Ядро и функция из переменных KERNEL и FUNC, проверенные до запуска воркеров"""
+    kernel = os.getenv("KERNEL", "python")
+    func = os.getenv("FUNC") or None
+    reduce_range(1, 1, kernel, func)
+    return kernel, func
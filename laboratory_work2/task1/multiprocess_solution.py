@@ -1,25 +1,56 @@
 import multiprocessing
+import threading
 import time
 import os
 
-def calculate_sum(start_end):
-    start, end = start_end
-    return sum(range(start, end))
+from kernels import kernel_settings, reduce_range
+
+STARTUP_TIMEOUT = 60
+
+
+def init_worker(kernel, ready):
+    # Прогрев: numpy импортируется при запуске процесса, а не внутри замера счёта
+    try:
+        if kernel == "numpy":
+            import numpy  # noqa: F401
+    except Exception:
+        # Ломаем барьер, чтобы родитель не ждал процесс, который уже не запустится
+        ready.abort()
+        raise
+    ready.wait()
+
+
+def calculate_sum(task):
+    start, end, kernel, func = task
+    return reduce_range(start, end, kernel, func)
+
 
 def main():
     target = int(os.getenv("TARGET", "1000000000"))
     num_processes = 4
+    kernel, func = kernel_settings()
     chunk_size = target // num_processes
-    ranges = [(i * chunk_size + 1, (i + 1) * chunk_size + 1) for i in range(num_processes)]
+    ranges = [(i * chunk_size + 1, (i + 1) * chunk_size + 1, kernel, func) for i in range(num_processes)]
     start_time = time.time()
 
-    with multiprocessing.Pool(processes=num_processes) as pool:
+    ready = multiprocessing.Barrier(num_processes + 1)
+    with multiprocessing.Pool(processes=num_processes, initializer=init_worker, initargs=(kernel, ready)) as pool:
+        # Ждём, пока все процессы запустятся и импортируют модули
+        try:
+            ready.wait(timeout=STARTUP_TIMEOUT)
+        except threading.BrokenBarrierError:
+            raise RuntimeError("Процессы пула не запустились, причина - в выводе выше") from None
+        startup = time.time() - start_time
+        compute_start = time.time()
         results = pool.map(calculate_sum, ranges)
+        compute = time.time() - compute_start
 
     total_sum = sum(results)
-    print(f"Количество процессов: {num_processes}")
+    print(f"Количество процессов: {num_processes}, ядро: {kernel}, функция: {func or 'x'}")
     print(f"Счёт до {target}")
     print(f"Общая сумма: {total_sum}")
+    print(f"Запуск процессов ({multiprocessing.get_start_method()}, импорт): {startup:.2f} секунд, "
+          f"счёт: {compute:.2f} секунд")
     print(f"Время выполнения при помощи multiprocessing: {time.time() - start_time:.2f} секунд")
 
 if __name__ == "__main__":
@@ -2,13 +2,16 @@ import threading
 import time
 import os
 
+from kernels import kernel_settings, reduce_range
 
-def calculate_sum(start, end, result, index):
-    result[index] = sum(range(start, end))
+
+def calculate_sum(start, end, result, index, kernel, func):
+    result[index] = reduce_range(start, end, kernel, func)
 
 
 target = int(os.getenv("TARGET", "1000000000"))
 num_threads = 4
+kernel, func = kernel_settings()
 chunk_size = target // num_threads
 threads = []
 results = [0] * num_threads
@@ -17,7 +20,7 @@ start_time = time.time()
 for i in range(num_threads):
     start = i * chunk_size + 1
     end = (i + 1) * chunk_size + 1
-    thread = threading.Thread(target=calculate_sum, args=(start, end, results, i))
+    thread = threading.Thread(target=calculate_sum, args=(start, end, results, i, kernel, func))
     threads.append(thread)
     thread.start()
 
@@ -26,7 +29,7 @@ for thread in threads:
 
 total_sum = sum(results)
 
-print(f"Количество потоков: {num_threads}")
+print(f"Количество потоков: {num_threads}, ядро: {kernel}, функция: {func or 'x'}")
 print(f"Счёт до {target}")
 print(f"Общая сумма: {total_sum}")
 print(f"Время выполнения при помощи threading: {time.time() - start_time:.2f} секунд")
@@ -3,39 +3,53 @@ import time
 
 import aiohttp
 
+from common.db import warm_genre_cache
+from common.fetch import fetch_page_async, ingesting, report_failures
 from common.parser import process_page_async
+from common.workers import WORKERS, WorkerStats, report_utilisation
 from urls import urls
 
 
 async def fetch(session, url):
-    async with session.get(url, timeout=10, ssl=False) as response:
-        text = await response.text()
-        return url, text
+    text = await fetch_page_async(session, url)
+    return url, text
 
 
 async def parse_and_save(session, url):
-    url, html = await fetch(session, url)
+    try:
+        url, html = await fetch(session, url)
+    except Exception:
+        # Ошибка уже записана в fetch_policy.failures, остальные задачи продолжают работу
+        return
     if html:
-        await process_page_async(html)
+        with ingesting(url):
+            await process_page_async(html)
 
 
-async def parse_chunk(session, chunk):
-    tasks = [parse_and_save(session, url) for url in chunk]
-    await asyncio.gather(*tasks)
+async def worker(session, url_queue, stats):
+    # Корутина берёт следующий URL, как только закончила предыдущий
+    while not url_queue.empty():
+        url = url_queue.get_nowait()
+        with stats.task():
+            await parse_and_save(session, url)
+    stats.finish()
 
 
 async def main():
-    num_chunks = 4
+    warm_genre_cache()
+    num_workers = WORKERS
     start_time = time.time()
+    url_queue = asyncio.Queue()
+    for url in urls:
+        url_queue.put_nowait(url)
 
-    chunk_size = (len(urls) + num_chunks - 1) // num_chunks
-    chunks = [urls[i:i + chunk_size] for i in range(0, len(urls), chunk_size)]
-
+    stats = [WorkerStats(f"task-{i}") for i in range(num_workers)]
     async with aiohttp.ClientSession() as session:
-        chunk_tasks = [parse_chunk(session, chunk) for chunk in chunks]
-        await asyncio.gather(*chunk_tasks)
+        await asyncio.gather(*(worker(session, url_queue, worker_stats) for worker_stats in stats))
 
-    print(f"Количество задач: {len(urls)}")
+    report_failures()
+    report_utilisation(stats, start_time)
+    print(f"Количество задач: {num_workers}, страниц: {len(urls)}")
     print(f"Время выполнения при помощи asyncio + aiohttp: {time.time() - start_time:.2f} секунд")
 
 
@@ -0,0 +1,320 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import resource
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Меряем загрузку и разбор, дисковый кэш страниц тут только мешает
+os.environ["PAGE_CACHE_DIR"] = ""
+
+import aiohttp
+
+from common.extractors import get_extractor
+from common.fetch import fetch_page, fetch_page_async
+from common.pipeline import Pipeline
+from common.stub_server import StubServer, page_urls, synthetic_page
+from extractor_benchmark import FIXTURES_DIR
+
+CPU_COUNT = os.cpu_count() or 1
+
+
+def parse_page(html):
+    """Тот же отбор, что в parse_links_as_books, но без записи в БД"""
+    return sum(1 for href, title in get_extractor().links(html) if title and "/book/" in href)
+
+
+def parse_books(html):
+    return [href for href, title in get_extractor().links(html) if title and "/book/" in href]
+
+
+def fetch_and_parse(url):
+    start = time.perf_counter()
+    parse_page(fetch_page(url))
+    return time.perf_counter() - start
+
+
+def split(urls, workers):
+    chunk_size = (len(urls) + workers - 1) // workers
+    return [urls[i:i + chunk_size] for i in range(0, len(urls), chunk_size)]
+
+
+def run_threading_chunks(urls, workers):
+    """Статическое деление на куски, как было в threading_parser"""
+    latencies = []
+
+    def work(chunk):
+        latencies.extend(fetch_and_parse(url) for url in chunk)
+
+    threads = [threading.Thread(target=work, args=(chunk,)) for chunk in split(urls, workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def run_threading(urls, workers):
+    """Общая очередь, как в threading_parser"""
+    latencies = []
+    url_queue = queue.Queue()
+    for url in urls:
+        url_queue.put(url)
+
+    def work():
+        while True:
+            try:
+                url = url_queue.get_nowait()
+            except queue.Empty:
+                return
+            latencies.append(fetch_and_parse(url))
+
+    threads = [threading.Thread(target=work) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def _process_chunk(chunk, results):
+    results.put([fetch_and_parse(url) for url in chunk])
+
+
+def _process_queue(url_queue, results):
+    results.put([fetch_and_parse(url) for url in iter(url_queue.get, None)])
+
+
+def _collect(processes, results):
+    for process in processes:
+        process.start()
+    # Забираем результаты до join, иначе процесс может зависнуть на полной очереди
+    latencies = [latency for _ in processes for latency in results.get()]
+    for process in processes:
+        process.join()
+    return latencies
+
+
+def run_multiprocessing_chunks(urls, workers):
+    results = multiprocessing.Queue()
+    return _collect([multiprocessing.Process(target=_process_chunk, args=(chunk, results))
+                     for chunk in split(urls, workers)], results)
+
+
+def run_multiprocessing(urls, workers):
+    url_queue = multiprocessing.Queue()
+    results = multiprocessing.Queue()
+    for url in [*urls, *[None] * workers]:
+        url_queue.put(url)
+    return _collect([multiprocessing.Process(target=_process_queue, args=(url_queue, results))
+                     for _ in range(workers)], results)
+
+
+async def _async_fetch_and_parse(session, url, parse):
+    start = time.perf_counter()
+    await parse(await fetch_page_async(session, url))
+    return time.perf_counter() - start
+
+
+async def _async_main(urls, workers, parse, chunks=False):
+    latencies = []
+    url_queue = asyncio.Queue()
+    for url in urls:
+        url_queue.put_nowait(url)
+
+    async def work_queue(session):
+        while not url_queue.empty():
+            latencies.append(await _async_fetch_and_parse(session, url_queue.get_nowait(), parse))
+
+    async def work_chunk(session, chunk):
+        for url in chunk:
+            latencies.append(await _async_fetch_and_parse(session, url, parse))
+
+    async with aiohttp.ClientSession() as session:
+        if chunks:
+            await asyncio.gather(*(work_chunk(session, chunk) for chunk in split(urls, workers)))
+        else:
+            await asyncio.gather(*(work_queue(session) for _ in range(workers)))
+    return latencies
+
+
+async def _parse_on_loop(html):
+    # Как в async_parser: разбор прямо в event loop
+    return parse_page(html)
+
+
+def run_async(urls, workers):
+    return asyncio.run(_async_main(urls, workers, _parse_on_loop))
+
+
+def run_async_chunks(urls, workers):
+    return asyncio.run(_async_main(urls, workers, _parse_on_loop, chunks=True))
+
+
+def run_async_process_pool(urls, workers):
+    """Гибрид: загрузка в event loop, разбор в пуле процессов"""
+    with ProcessPoolExecutor(max_workers=CPU_COUNT) as pool:
+        async def parse(html):
+            return await asyncio.get_running_loop().run_in_executor(pool, parse_page, html)
+
+        return asyncio.run(_async_main(urls, workers, parse))
+
+
+def _threads_in_process(url_queue, threads, results):
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results.put(list(executor.map(fetch_and_parse, iter(url_queue.get, None))))
+
+
+def run_processes_threads(urls, workers):
+    """Гибрид: по процессу на ядро, в каждом пул потоков; workers - потоков всего"""
+    processes_count = min(workers, CPU_COUNT)
+    threads = (workers + processes_count - 1) // processes_count
+    url_queue = multiprocessing.Queue()
+    results = multiprocessing.Queue()
+    for url in [*urls, *[None] * processes_count]:
+        url_queue.put(url)
+    return _collect([multiprocessing.Process(target=_threads_in_process, args=(url_queue, threads, results))
+                     for _ in range(processes_count)], results)
+
+
+async def _discard(batch):
+    pass
+
+
+def run_pipeline(urls, workers):
+    """Конвейер из pipeline_parser: workers загрузчиков, разбор в пуле процессов, запись пачками"""
+    pipeline = Pipeline(parse_books, _discard, fetchers=workers, parsers=CPU_COUNT)
+    asyncio.run(pipeline.run(urls))
+    return pipeline.latencies
+
+
+STRATEGIES = {
+    "threading": run_threading,
+    "threading-chunks": run_threading_chunks,
+    "multiprocessing": run_multiprocessing,
+    "multiprocessing-chunks": run_multiprocessing_chunks,
+    "async": run_async,
+    "async-chunks": run_async_chunks,
+    "async+processes": run_async_process_pool,
+    "processes+threads": run_processes_threads,
+    "pipeline": run_pipeline,
+}
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_trial(strategy, workers, urls):
+    """Один прогон; выполняется в отдельном процессе, чтобы CPU и пиковая память считались только для него"""
+    start = time.perf_counter()
+    latencies = STRATEGIES[strategy](urls, workers)
+    wall = time.perf_counter() - start
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        "strategy": strategy,
+        "workers": workers,
+        "urls": len(urls),
+        "wall_s": round(wall, 3),
+        "pages_per_s": round(len(latencies) / wall, 1),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "cpu_s": round(own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime, 2),
+        # ru_maxrss в Linux в килобайтах; для детей - максимум по одному процессу
+        "rss_mb": round(own.ru_maxrss / 1024, 1),
+        "child_rss_mb": round(children.ru_maxrss / 1024, 1),
+    }
+
+
+def spawn_trial(strategy, workers, base_url, count):
+    command = [sys.executable, os.path.abspath(__file__), "--trial",
+               json.dumps({"strategy": strategy, "workers": workers, "base_url": base_url, "count": count})]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {"strategy": strategy, "workers": workers, "urls": count,
+                "error": completed.stderr.strip().splitlines()[-1:]}
+    # Последняя строка - результат, выше может быть вывод парсера
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def load_pages():
+    pages = [path.read_text(encoding="utf-8") for path in sorted(FIXTURES_DIR.glob("*.html"))]
+    if not pages:
+        print(f"Нет страниц в {FIXTURES_DIR}, используется синтетическая страница")
+        pages = [synthetic_page()]
+    return pages
+
+
+COLUMNS = ("strategy", "workers", "urls", "pages_per_s", "p50_ms", "p99_ms", "cpu_s", "rss_mb", "child_rss_mb")
+
+
+def format_row(values):
+    return " | ".join(f"{value:>{22 if column == 'strategy' else max(len(column), 7)}}"
+                      for column, value in zip(COLUMNS, values))
+
+
+def print_row(row):
+    if "error" in row:
+        print(format_row([row["strategy"], row["workers"], row["urls"]]) + f" | ошибка: {row['error']}")
+    else:
+        print(format_row([row[column] for column in COLUMNS]))
+
+
+def int_list(value):
+    return [int(item) for item in value.split(",")]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Сравнение стратегий парсинга на локальном stub-сервере")
+    arg_parser.add_argument("--strategies", default=",".join(STRATEGIES),
+                            help=f"через запятую из: {', '.join(STRATEGIES)}")
+    arg_parser.add_argument("--workers", type=int_list, default=[1, 4, 16], help="например 1,4,16")
+    arg_parser.add_argument("--urls", type=int_list, default=[100], help="например 50,200")
+    arg_parser.add_argument("--latency", type=float, default=100, help="задержка ответа, мс")
+    arg_parser.add_argument("--jitter", type=float, default=20, help="разброс задержки, мс")
+    arg_parser.add_argument("--slow-fraction", type=float, default=0.0, help="доля медленных страниц")
+    arg_parser.add_argument("--slow-latency", type=float, default=2000, help="задержка медленных страниц, мс")
+    arg_parser.add_argument("--json", help="сохранить результаты в файл")
+    arg_parser.add_argument("--trial", help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.trial:
+        trial = json.loads(args.trial)
+        urls = page_urls(trial["base_url"], trial["count"])
+        print(json.dumps(run_trial(trial["strategy"], trial["workers"], urls)))
+        return
+
+    strategies = args.strategies.split(",")
+    unknown = set(strategies) - set(STRATEGIES)
+    if unknown:
+        raise SystemExit(f"Неизвестные стратегии: {', '.join(sorted(unknown))}")
+
+    stub = StubServer(load_pages(), latency=args.latency / 1000, jitter=args.jitter / 1000,
+                      slow_fraction=args.slow_fraction, slow_latency=args.slow_latency / 1000)
+    results = []
+    with stub:
+        print(f"Задержка {args.latency:.0f}±{args.jitter:.0f} мс, ядер: {CPU_COUNT}")
+        print(format_row(COLUMNS))
+        for count in args.urls:
+            for workers in args.workers:
+                for strategy in strategies:
+                    row = spawn_trial(strategy, workers, stub.base_url, count)
+                    print_row(row)
+                    results.append(row)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+        print(f"Результаты сохранены в {args.json}")
+
+
+if __name__ == "__main__":
+    main()
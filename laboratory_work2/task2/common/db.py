@@ -1,68 +1,145 @@
-from typing import Optional
-from common.connection import get_session, get_sync_session
+from typing import Dict
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from common.connection import async_session, get_sync_session
 from common.models import Genre, Book
 
-def get_or_create_genre(session, genre_name: str) -> Optional[int]:
-    if not genre_name:
-        return None
+DEFAULT_GENRE_ID = 1
+
+# Кэш имя жанра -> id на весь процесс: жанры не удаляются и не переименовываются,
+# поэтому запись в кэше не устаревает. Заполняется в warm_genre_cache при запуске,
+# а если её не вызвали - всеми жанрами при первой записи.
+_genre_ids: Dict[str, int] = {}
+_genre_cache_warm = False
+
+
+# Жанры, созданные до уникального индекса, могли задвоиться: оставляем копию
+# с меньшим id и переносим на неё книги и предпочтения пользователей
+_MERGE_DUPLICATE_GENRES = (
+    """
+    CREATE TEMP TABLE genre_duplicate ON COMMIT DROP AS
+    SELECT genre.id AS duplicate_id, keep.id AS keep_id
+    FROM genre
+    JOIN (SELECT name, min(id) AS id FROM genre GROUP BY name) AS keep USING (name)
+    WHERE genre.id <> keep.id
+    """,
+    "UPDATE book SET genre_id = d.keep_id FROM genre_duplicate d WHERE book.genre_id = d.duplicate_id",
+    """
+    INSERT INTO usergenre (user_id, genre_id, preference_level)
+    SELECT usergenre.user_id, d.keep_id, max(usergenre.preference_level)
+    FROM usergenre JOIN genre_duplicate d ON usergenre.genre_id = d.duplicate_id
+    GROUP BY usergenre.user_id, d.keep_id
+    ON CONFLICT (user_id, genre_id)
+    DO UPDATE SET preference_level = GREATEST(usergenre.preference_level, EXCLUDED.preference_level)
+    """,
+    "DELETE FROM usergenre USING genre_duplicate d WHERE usergenre.genre_id = d.duplicate_id",
+    "DELETE FROM genre USING genre_duplicate d WHERE genre.id = d.duplicate_id",
+    "CREATE UNIQUE INDEX ix_genre_name ON genre (name)",
+)
+
+
+def _ensure_genre_name_index(session):
+    """ON CONFLICT (name) требует уникального индекса; в старых базах его нет"""
+    if session.execute(text("SELECT to_regclass('ix_genre_name')")).scalar() is None:
+        for statement in _MERGE_DUPLICATE_GENRES:
+            session.execute(text(statement))
+        print("[DB] Создан уникальный индекс ix_genre_name")
 
-    genre = session.query(Genre).filter_by(name=genre_name).first()
-    if not genre:
-        genre = Genre(name=genre_name)
-        session.add(genre)
+
+def warm_genre_cache():
+    """Вызывается при запуске: индекс по имени жанра и все жанры в кэш до первой записи.
+
+    Запускать в основном процессе до старта воркеров, чтобы индекс не
+    создавали несколько процессов сразу; в процессах-воркерах - ещё раз,
+    чтобы заполнить их собственный кэш.
+    """
+    global _genre_cache_warm
+    with get_sync_session() as session:
+        _ensure_genre_name_index(session)
+        _genre_ids.update(session.execute(select(Genre.name, Genre.id)).tuples().all())
         session.commit()
-        session.refresh(genre)
-    return genre.id
-
-async def get_or_create_genre_async(session, genre_name: str) -> Optional[int]:
-    if not genre_name:
-        return None
-
-    genre = await session.get(Genre, genre_name)  # Используем async методы
-    if not genre:
-        # Ищем по имени
-        from sqlalchemy import select
-        stmt = select(Genre).where(Genre.name == genre_name)
-        result = await session.execute(stmt)
-        genre = result.scalar_one_or_none()
-        
-        if not genre:
-            genre = Genre(name=genre_name)
-            session.add(genre)
-            await session.commit()
-            await session.refresh(genre)
-    return genre.id
+    _genre_cache_warm = True
+
+
+def _missing_genres(books_data):
+    names = {data["genre_name"] for data in books_data if data["genre_name"]}
+    return sorted(names - _genre_ids.keys())
+
+
+def _upsert_genres(names):
+    """Один INSERT на все новые жанры.
+
+    DO UPDATE вместо DO NOTHING нужен, чтобы RETURNING вернул id и тех жанров,
+    которые успел создать другой процесс. Имена отсортированы, чтобы
+    параллельные пачки брали блокировки в одном порядке.
+    """
+    statement = pg_insert(Genre).values([{"name": name} for name in names])
+    statement = statement.on_conflict_do_update(index_elements=[Genre.name], set_={"name": statement.excluded.name})
+    return statement.returning(Genre.name, Genre.id)
+
+
+def get_genre_ids(session, books_data) -> Dict[str, int]:
+    """Карта жанров для пачки. Новые жанры попадают в кэш только после коммита (remember_genres)"""
+    global _genre_cache_warm
+    if not _genre_cache_warm:
+        _genre_ids.update(session.execute(select(Genre.name, Genre.id)).tuples().all())
+        _genre_cache_warm = True
+    missing = _missing_genres(books_data)
+    if not missing:
+        return _genre_ids
+    return {**_genre_ids, **dict(session.execute(_upsert_genres(missing)).tuples().all())}
+
+
+async def get_genre_ids_async(session, books_data) -> Dict[str, int]:
+    global _genre_cache_warm
+    if not _genre_cache_warm:
+        _genre_ids.update((await session.execute(select(Genre.name, Genre.id))).tuples().all())
+        _genre_cache_warm = True
+    missing = _missing_genres(books_data)
+    if not missing:
+        return _genre_ids
+    return {**_genre_ids, **dict((await session.execute(_upsert_genres(missing))).tuples().all())}
+
+
+def remember_genres(genre_ids):
+    # После отката транзакции созданных в ней жанров нет, кэшировать их id нельзя
+    if genre_ids is not _genre_ids:
+        _genre_ids.update(genre_ids)
+
+
+def _book_rows(books_data, genre_ids):
+    return [
+        {
+            "title": data["title"],
+            "author": data["author"],
+            "description": data["description"],
+            "year": data["year"],
+            "genre_id": genre_ids[data["genre_name"]] if data["genre_name"] else DEFAULT_GENRE_ID,
+            "owner_id": 1,
+            "available": True,
+        }
+        for data in books_data
+    ]
+
 
 def save_books(books_data):
+    if not books_data:
+        return
     # Используем синхронную сессию для multiprocessing
     with get_sync_session() as session:
-        for data in books_data:
-            genre_id = get_or_create_genre(session, data["genre_name"]) if data["genre_name"] else 1
-
-            book = Book(
-                title=data["title"],
-                author=data["author"],
-                description=data["description"],
-                year=data["year"],
-                genre_id=genre_id,
-                owner_id=1
-            )
-            session.add(book)
+        genre_ids = get_genre_ids(session, books_data)
+        session.execute(insert(Book), _book_rows(books_data, genre_ids))
         session.commit()
+    remember_genres(genre_ids)
+
 
 async def save_books_async(books_data):
-    async for session in get_session():
-        async with session.begin():
-            for data in books_data:
-                genre_id = await get_or_create_genre_async(session, data["genre_name"]) if data["genre_name"] else 1
-
-                book = Book(
-                    title=data["title"],
-                    author=data["author"],
-                    description=data["description"],
-                    year=data["year"],
-                    genre_id=genre_id,
-                    owner_id=1
-                )
-                session.add(book)
-            await session.commit()
\ No newline at end of file
+    if not books_data:
+        return
+    # Жанры и книги - в одной транзакции, коммит делает session.begin() на выходе
+    async with async_session() as session, session.begin():
+        genre_ids = await get_genre_ids_async(session, books_data)
+        await session.execute(insert(Book), _book_rows(books_data, genre_ids))
+    remember_genres(genre_ids)
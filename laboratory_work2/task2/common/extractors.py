@@ -0,0 +1,130 @@
+import os
+import re
+from abc import ABC, abstractmethod
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+
+# lxml не принимает str с объявлением кодировки
+XML_ENCODING_DECLARATION = re.compile(r"^\s*<\?xml[^>]*encoding=")
+
+
+class LinkExtractor(ABC):
+    """Достаёт из HTML пары (href, текст ссылки) для всех <a href>"""
+
+    @abstractmethod
+    def links(self, html):
+        ...
+
+
+class SoupExtractor(LinkExtractor):
+    """Полное дерево BeautifulSoup + CSS-селектор, исходный вариант"""
+
+    def links(self, html):
+        soup = BeautifulSoup(html, "html.parser")
+        for a_tag in soup.select("a[href]"):
+            yield a_tag["href"], a_tag.text.strip()
+
+
+class StrainerExtractor(LinkExtractor):
+    """BeautifulSoup, но в дерево попадают только теги <a href>"""
+
+    only_links = SoupStrainer("a", href=True)
+
+    def links(self, html):
+        soup = BeautifulSoup(html, "html.parser", parse_only=self.only_links)
+        for a_tag in soup.find_all("a", href=True):
+            yield a_tag["href"], a_tag.text.strip()
+
+
+class _AnchorParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.found = []
+        self._href = None
+        self._text = []
+
+    def _flush(self):
+        if self._href is not None:
+            self.found.append((self._href, "".join(self._text).strip()))
+            self._href = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a":
+            return
+        self._flush()
+        href = dict(attrs).get("href")
+        if href is not None:
+            self._href = href
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if tag == "a":
+            self._flush()
+
+    def handle_data(self, data):
+        if self._href is not None:
+            self._text.append(data)
+
+    def close(self):
+        super().close()
+        # Незакрытая ссылка в конце документа
+        self._flush()
+
+
+class StreamExtractor(LinkExtractor):
+    """Потоковый html.parser без построения дерева"""
+
+    def links(self, html):
+        parser = _AnchorParser()
+        parser.feed(html)
+        parser.close()
+        return parser.found
+
+
+class LxmlExtractor(LinkExtractor):
+    """Разбор на C через lxml (нужен пакет lxml)"""
+
+    def __init__(self):
+        import lxml.etree
+        import lxml.html
+        self._fromstring = lxml.html.fromstring
+        self._parser_error = lxml.etree.ParserError
+        self._utf8_parser = lxml.html.HTMLParser(encoding="utf-8")
+
+    def links(self, html):
+        parser = None
+        if XML_ENCODING_DECLARATION.match(html):
+            # str с объявлением кодировки lxml не принимает - отдаём байты
+            # и явно говорим, что они в UTF-8, а не в объявленной кодировке
+            html = html.encode("utf-8")
+            parser = self._utf8_parser
+        try:
+            tree = self._fromstring(html, parser=parser)
+        except self._parser_error:
+            # Пустой документ или одни комментарии - ссылок нет
+            return
+        for a_tag in tree.iter("a"):
+            href = a_tag.get("href")
+            if href is not None:
+                yield href, a_tag.text_content().strip()
+
+
+EXTRACTORS = {
+    "soup": SoupExtractor,
+    "strainer": StrainerExtractor,
+    "stream": StreamExtractor,
+    "lxml": LxmlExtractor,
+}
+_instances = {}
+
+
+def get_extractor(name=None) -> LinkExtractor:
+    """Экстрактор по имени; по умолчанию из переменной HTML_EXTRACTOR"""
+    name = name or os.getenv("HTML_EXTRACTOR", "stream")
+    if name not in _instances:
+        if name not in EXTRACTORS:
+            raise ValueError(f"Unknown HTML extractor '{name}', expected one of {sorted(EXTRACTORS)}")
+        _instances[name] = EXTRACTORS[name]()
+    return _instances[name]
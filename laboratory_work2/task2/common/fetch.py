@@ -0,0 +1,85 @@
+import asyncio
+from contextlib import contextmanager
+
+import aiohttp
+import requests
+
+from common.fetch_policy import check_status, fetch_policy_from_env
+from common.page_cache import page_cache_from_env
+
+page_cache = page_cache_from_env()
+fetch_policy = fetch_policy_from_env()
+# Временные сетевые ошибки, после которых запрос стоит повторить
+RETRY_ON = (requests.Timeout, requests.ConnectionError)
+RETRY_ON_ASYNC = (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)
+
+
+def _remember(url, text, headers):
+    if page_cache:
+        page_cache.stage(url, text, headers.get("ETag"), headers.get("Last-Modified"))
+
+
+def commit_page(url):
+    if page_cache:
+        page_cache.commit(url)
+
+
+def discard_page(url):
+    if page_cache:
+        page_cache.discard(url)
+
+
+@contextmanager
+def ingesting(url):
+    """Валидаторы страницы попадут в кэш, только если блок (разбор и запись) прошёл без ошибки"""
+    try:
+        yield
+    except BaseException:
+        discard_page(url)
+        raise
+    commit_page(url)
+
+
+def fetch_page(url):
+    """HTML страницы или None, если сервер ответил 304 и разбирать её заново не нужно.
+
+    Страницу нужно обработать внутри ingesting(url), иначе 304 по ней не придёт.
+
+    429/5xx и таймауты повторяются по fetch_policy, при неудаче бросается исключение.
+    """
+    def attempt():
+        headers = page_cache.conditional_headers(url) if page_cache else {}
+        response = requests.get(url, timeout=fetch_policy.timeout, headers=headers)
+        if response.status_code == 304 and page_cache:
+            page_cache.touch(url)
+            return None
+        check_status(url, response.status_code, response.headers)
+        _remember(url, response.text, response.headers)
+        return response.text
+
+    return fetch_policy.call(url, attempt, retry_on=RETRY_ON)
+
+
+async def fetch_page_async(session, url):
+    timeout = aiohttp.ClientTimeout(total=fetch_policy.timeout)
+
+    async def attempt():
+        headers = page_cache.conditional_headers(url) if page_cache else {}
+        async with session.get(url, timeout=timeout, ssl=False, headers=headers) as response:
+            if response.status == 304 and page_cache:
+                page_cache.touch(url)
+                return None
+            check_status(url, response.status, response.headers)
+            text = await response.text()
+            _remember(url, text, response.headers)
+            return text
+
+    return await fetch_policy.call_async(url, attempt, retry_on=RETRY_ON_ASYNC)
+
+
+def report_failures():
+    """Ошибки загрузки по URL, накопленные в этом процессе"""
+    if fetch_policy.failures:
+        print(f"Не удалось загрузить страниц: {len(fetch_policy.failures)}")
+        for url, error in fetch_policy.failures.items():
+            print(f"  {url}: {error}")
@@ -0,0 +1,202 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    def __init__(self, url, reason, status=None):
+        super().__init__(reason)
+        self.url = url
+        self.status = status
+
+
+class RetryableError(FetchError):
+    """429/5xx: запрос можно повторить, retry_after - подсказка сервера в секундах"""
+
+    def __init__(self, url, status, retry_after=None):
+        super().__init__(url, f"HTTP {status}", status)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(FetchError):
+    def __init__(self, url, host):
+        super().__init__(url, f"хост {host} временно отключён после серии ошибок")
+
+
+def parse_retry_after(value):
+    """Retry-After бывает числом секунд или HTTP-датой"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def check_status(url, status, headers):
+    if status in RETRY_STATUSES:
+        raise RetryableError(url, status, parse_retry_after(headers.get("Retry-After")))
+    if status >= 400:
+        raise FetchError(url, f"HTTP {status}", status)
+
+
+class CircuitBreaker:
+    """Размыкатель по хостам.
+
+    После threshold ошибок подряд хост отключается на cooldown секунд: запросы
+    к нему сразу падают с CircuitOpenError. По истечении паузы пропускается
+    один пробный запрос - успех замыкает цепь, ошибка снова её размыкает.
+    """
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._errors = {}
+        self._open_until = {}
+        self._lock = threading.Lock()
+
+    def allow(self, host):
+        with self._lock:
+            open_until = self._open_until.get(host)
+            if open_until is None:
+                return True
+            now = time.monotonic()
+            if now < open_until:
+                return False
+            # Пробный запрос: остальные ждут ещё одну паузу, пока он не завершится
+            self._open_until[host] = now + self.cooldown
+            return True
+
+    def record_success(self, host):
+        with self._lock:
+            self._errors.pop(host, None)
+            self._open_until.pop(host, None)
+
+    def record_failure(self, host):
+        with self._lock:
+            self._errors[host] = self._errors.get(host, 0) + 1
+            if self._errors[host] >= self.threshold:
+                self._open_until[host] = time.monotonic() + self.cooldown
+                print(f"[FETCH] Хост {host} отключён на {self.cooldown:.0f} с")
+
+
+class FetchPolicy:
+    """Повторы с экспоненциальной паузой и jitter, размыкатель по хостам и журнал ошибок по URL.
+
+    send - одна попытка запроса. Она бросает RetryableError на 429/5xx, а
+    исключения из retry_on (таймауты, обрывы соединения) тоже считаются
+    временными. Остальные ошибки не повторяются.
+
+    failures хранит последние max_failures ошибок: в долгоживущем сервисе
+    журнал иначе рос бы всё время жизни процесса.
+    """
+
+    def __init__(self, timeout, retries, backoff_base, backoff_max, breaker, max_failures=1000):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker
+        self.max_failures = max_failures
+        self.failures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        # Full jitter: клиенты, упавшие одновременно, не повторяют запрос хором
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _check_breaker(self, url):
+        host = urlsplit(url).netloc
+        if not self.breaker.allow(host):
+            error = CircuitOpenError(url, host)
+            self._record(url, error)
+            raise error
+        return host
+
+    def _handle(self, url, host, attempt, error, retry_on):
+        """Пауза перед следующей попыткой или None, если повторять не нужно"""
+        if not isinstance(error, (RetryableError, *retry_on)):
+            # 404 и прочее: хост отвечает, виновата сама страница
+            self.breaker.record_success(host)
+            self._record(url, error)
+            return None
+        self.breaker.record_failure(host)
+        if attempt >= self.retries:
+            self._record(url, error)
+            return None
+        return self.delay(attempt, getattr(error, "retry_after", None))
+
+    def _record(self, url, error):
+        message = str(error) or type(error).__name__
+        with self._lock:
+            self.failures[url] = message
+            self.failures.move_to_end(url)
+            while len(self.failures) > self.max_failures:
+                self.failures.popitem(last=False)
+        print(f"[FETCH] Не удалось загрузить {url}: {message}")
+
+    def _success(self, url, host):
+        self.breaker.record_success(host)
+        with self._lock:
+            self.failures.pop(url, None)
+
+    def call(self, url, send, retry_on=()):
+        attempt = 0
+        while True:
+            host = self._check_breaker(url)
+            try:
+                result = send()
+            except Exception as e:
+                pause = self._handle(url, host, attempt, e, retry_on)
+                if pause is None:
+                    raise
+                time.sleep(pause)
+                attempt += 1
+                continue
+            self._success(url, host)
+            return result
+
+    async def call_async(self, url, send, retry_on=()):
+        attempt = 0
+        while True:
+            host = self._check_breaker(url)
+            try:
+                result = await send()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                pause = self._handle(url, host, attempt, e, retry_on)
+                if pause is None:
+                    raise
+                await asyncio.sleep(pause)
+                attempt += 1
+                continue
+            self._success(url, host)
+            return result
+
+
+def fetch_policy_from_env():
+    return FetchPolicy(
+        timeout=float(os.getenv("FETCH_TIMEOUT", 10)),
+        retries=int(os.getenv("FETCH_RETRIES", 3)),
+        backoff_base=float(os.getenv("FETCH_BACKOFF_BASE", 0.5)),
+        backoff_max=float(os.getenv("FETCH_BACKOFF_MAX", 30)),
+        breaker=CircuitBreaker(
+            threshold=int(os.getenv("FETCH_BREAKER_THRESHOLD", 5)),
+            cooldown=float(os.getenv("FETCH_BREAKER_COOLDOWN", 60)),
+        ),
+        max_failures=int(os.getenv("FETCH_FAILURES_MAX", 1000)),
+    )
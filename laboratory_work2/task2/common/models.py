@@ -34,7 +34,7 @@ class Book(SQLModel, table=True):
 
 class Genre(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    name: str
+    name: str = Field(unique=True, index=True)
 
     books: List[Book] = Relationship(back_populates="genre")
     users: List["UserGenre"] = Relationship(back_populates="genre")
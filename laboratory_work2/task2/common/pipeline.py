@@ -0,0 +1,144 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import aiohttp
+
+from common.fetch import commit_page, discard_page, fetch_page_async
+
+FETCHERS = int(os.getenv("PIPELINE_FETCHERS", 16))
+PARSERS = int(os.getenv("PIPELINE_PARSERS", os.cpu_count() or 1))
+QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 32))
+BATCH_SIZE = int(os.getenv("PIPELINE_BATCH_SIZE", 500))
+FLUSH_INTERVAL = float(os.getenv("PIPELINE_FLUSH_INTERVAL", 1.0))
+
+_DONE = object()
+
+
+class Pipeline:
+    """Конвейер загрузка -> разбор -> запись, стадии работают одновременно.
+
+    fetchers корутин качают страницы через aiohttp, parsers корутин отдают HTML
+    в пул процессов (parse должна быть функцией уровня модуля), а одна
+    корутина копит книги и вызывает await save(batch) пачками по batch_size
+    или раз в flush_interval секунд. Страница помечается в кэше загруженной
+    только после записи пачки с её книгами. Между стадиями - очереди на queue_size
+    элементов: если запись или разбор не успевают, загрузка ждёт.
+    """
+
+    def __init__(self, parse, save, fetchers=FETCHERS, parsers=PARSERS, queue_size=QUEUE_SIZE,
+                 batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.parse = parse
+        self.save = save
+        self.fetchers = fetchers
+        self.parsers = parsers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.pages = 0
+        self.books = 0
+        self.batches = 0
+        self.failed = {}
+        # От начала загрузки до конца разбора, по каждой странице
+        self.latencies = []
+
+    async def _fetcher(self, session, urls, pages):
+        while True:
+            url = await urls.get()
+            if url is _DONE:
+                break
+            started = time.perf_counter()
+            try:
+                html = await fetch_page_async(session, url)
+            except Exception as e:
+                # Ошибка уже записана в fetch_policy.failures, качаем дальше
+                self.failed[url] = str(e) or type(e).__name__
+                continue
+            if html:
+                await pages.put((url, html, started))
+
+    async def _parser(self, pool, pages, books):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await pages.get()
+            if item is _DONE:
+                break
+            url, html, started = item
+            try:
+                parsed = await loop.run_in_executor(pool, self.parse, html)
+            except Exception as e:
+                print(f"[PIPELINE] Ошибка разбора {url}: {e}")
+                self.failed[url] = str(e)
+                discard_page(url)
+                continue
+            self.pages += 1
+            self.latencies.append(time.perf_counter() - started)
+            if parsed:
+                await books.put((url, parsed))
+            else:
+                commit_page(url)
+
+    async def _flush(self, batch, batch_urls):
+        if batch:
+            await self.save(batch)
+            self.books += len(batch)
+            self.batches += 1
+        for url in batch_urls:
+            commit_page(url)
+
+    async def _writer(self, books):
+        batch, batch_urls = [], []
+        while True:
+            try:
+                item = await asyncio.wait_for(books.get(), timeout=self.flush_interval if batch else None)
+            except asyncio.TimeoutError:
+                await self._flush(batch, batch_urls)
+                batch, batch_urls = [], []
+                continue
+            if item is _DONE:
+                break
+            url, parsed = item
+            batch.extend(parsed)
+            batch_urls.append(url)
+            if len(batch) >= self.batch_size:
+                await self._flush(batch, batch_urls)
+                batch, batch_urls = [], []
+        await self._flush(batch, batch_urls)
+
+    async def _feed(self, urls, url_queue, pages, books, fetch_tasks, parse_tasks):
+        """Подаёт URL и по очереди закрывает стадии, когда предыдущая закончилась"""
+        for url in urls:
+            await url_queue.put(url)
+        for _ in fetch_tasks:
+            await url_queue.put(_DONE)
+        await asyncio.gather(*fetch_tasks)
+        for _ in parse_tasks:
+            await pages.put(_DONE)
+        await asyncio.gather(*parse_tasks)
+        await books.put(_DONE)
+
+    async def run(self, urls):
+        url_queue = asyncio.Queue(self.queue_size)
+        pages = asyncio.Queue(self.queue_size)
+        books = asyncio.Queue(self.queue_size)
+
+        with ProcessPoolExecutor(max_workers=self.parsers) as pool:
+            async with aiohttp.ClientSession() as session:
+                fetch_tasks = [asyncio.create_task(self._fetcher(session, url_queue, pages))
+                               for _ in range(self.fetchers)]
+                parse_tasks = [asyncio.create_task(self._parser(pool, pages, books))
+                               for _ in range(self.parsers)]
+                writer = asyncio.create_task(self._writer(books))
+                feeder = asyncio.create_task(self._feed(urls, url_queue, pages, books, fetch_tasks, parse_tasks))
+                tasks = [*fetch_tasks, *parse_tasks, writer, feeder]
+                try:
+                    # Если упадёт запись, остальные стадии не должны вечно ждать места в очереди
+                    await asyncio.gather(writer, feeder)
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+
+        return {"pages": self.pages, "failed": len(self.failed), "books": self.books, "batches": self.batches}
@@ -0,0 +1,105 @@
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def synthetic_page(links=300):
+    """Страница, похожая на выдачу litres.ru, если записанных страниц нет"""
+    items = "\n".join(
+        f'<div class="card"><a href="/book/author-{i}/kniga-{i}/">Книга номер {i}</a>'
+        f'<a href="/author/author-{i}/">Автор {i}</a></div>'
+        for i in range(links)
+    )
+    return f"<html><head><title>Жанр</title></head><body>{items}</body></html>"
+
+
+def page_urls(base_url, count):
+    return [f"{base_url}/page/{n}" for n in range(count)]
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Сотни одновременных соединений при больших числах воркеров
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Клиент закрыл соединение раньше времени (отмена задач) - для бенчмарка это не ошибка
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StubServer:
+    """Локальный HTTP-сервер для бенчмарков: отдаёт страницы по кругу с задержкой.
+
+    /page/<n> возвращает pages[n % len(pages)] через latency секунд (± jitter).
+    Доля slow_fraction адресов отвечает за slow_latency - так видно, как
+    стратегия переносит медленные страницы.
+    """
+
+    def __init__(self, pages, latency=0.1, jitter=0.0, slow_fraction=0.0, slow_latency=1.0):
+        self.pages = [page.encode("utf-8") for page in pages]
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_fraction = slow_fraction
+        self.slow_latency = slow_latency
+        self._server = None
+
+    def delay_for(self, n):
+        # Медленные страницы выбираются по номеру, чтобы во всех прогонах были одни и те же
+        if self.slow_fraction and random.Random(n).random() < self.slow_fraction:
+            return self.slow_latency
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Заголовки и тело уходят разными write; с Nagle keep-alive клиенты ждут лишние ~40 мс
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                try:
+                    n = int(self.path.rstrip("/").rsplit("/", 1)[-1])
+                except ValueError:
+                    self.send_error(404)
+                    return
+                time.sleep(stub.delay_for(n))
+                body = stub.pages[n % len(stub.pages)]
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self, host="127.0.0.1", port=0):
+        self._server = _Server((host, port), self._handler())
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def urls(self, count):
+        return page_urls(self.base_url, count)
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,38 @@
+import os
+import time
+from contextlib import contextmanager
+
+WORKERS = int(os.getenv("PARSER_WORKERS", 4))
+
+
+class WorkerStats:
+    """Сколько страниц обработал воркер, сколько был занят и когда закончил"""
+
+    def __init__(self, name):
+        self.name = name
+        self.pages = 0
+        self.busy = 0.0
+        self.finished = None
+
+    @contextmanager
+    def task(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.pages += 1
+            self.busy += time.perf_counter() - started
+
+    def finish(self):
+        # time.time(), а не perf_counter: сравниваем моменты из разных процессов
+        self.finished = time.time()
+
+
+def report_utilisation(stats, start_time):
+    """Загрузка воркеров: при хорошем распределении все заканчивают почти одновременно"""
+    wall = time.time() - start_time
+    print(f"{'Воркер':>10} | {'страниц':>7} | {'занят, с':>8} | {'закончил, с':>11} | {'загрузка':>8}")
+    for worker in stats:
+        finished = (worker.finished or time.time()) - start_time
+        print(f"{worker.name:>10} | {worker.pages:>7} | {worker.busy:>8.2f} | {finished:>11.2f} | "
+              f"{worker.busy / wall:>8.0%}")
@@ -0,0 +1,67 @@
+import argparse
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import requests
+
+from common.extractors import EXTRACTORS, get_extractor
+from urls import urls
+
+FIXTURES_DIR = Path(os.getenv("FIXTURES_DIR", Path(__file__).parent / "fixtures"))
+
+
+def fixture_path(url):
+    return FIXTURES_DIR / f"{hashlib.sha1(url.encode()).hexdigest()[:16]}.html"
+
+
+def record_fixtures():
+    """Сохраняет страницы из urls.py, чтобы дальше мерить без сети"""
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    for url in urls:
+        response = requests.get(url, timeout=10)
+        response.raise_for_status()
+        fixture_path(url).write_text(response.text, encoding="utf-8")
+        print(f"Сохранено: {url} -> {fixture_path(url).name}")
+
+
+def load_fixtures():
+    pages = [path.read_text(encoding="utf-8") for path in sorted(FIXTURES_DIR.glob("*.html"))]
+    if not pages:
+        raise SystemExit(f"Нет страниц в {FIXTURES_DIR}, сначала запустите с --record")
+    return pages
+
+
+def benchmark(pages, repeat):
+    print(f"Страниц: {len(pages)}, повторов: {repeat}")
+    print(f"{'Экстрактор':>10} | {'стр/сек':>8} | {'книг':>6}")
+    for name in EXTRACTORS:
+        try:
+            extractor = get_extractor(name)
+        except ImportError as e:
+            print(f"{name:>10} | пропущен: {e}")
+            continue
+        start = time.perf_counter()
+        for _ in range(repeat):
+            # Тот же отбор, что в parse_links_as_books, но без импорта слоя БД
+            books = sum(
+                1 for html in pages for href, title in extractor.links(html) if title and "/book/" in href
+            )
+        elapsed = time.perf_counter() - start
+        print(f"{name:>10} | {len(pages) * repeat / elapsed:>8.1f} | {books:>6}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Скорость разбора страниц разными экстракторами ссылок")
+    arg_parser.add_argument("--record", action="store_true", help="скачать страницы из urls.py в fixtures")
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    if args.record:
+        record_fixtures()
+    benchmark(load_fixtures(), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
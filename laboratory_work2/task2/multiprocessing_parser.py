@@ -1,35 +1,176 @@
 import multiprocessing
+import os
+import queue
+import struct
+import threading
 import time
+import traceback
+from multiprocessing import shared_memory
 
-import requests
-
-from common.parser import process_page
+from common.connection import sync_engine
+from common.db import save_books, warm_genre_cache
+from common.fetch import fetch_page, ingesting, report_failures
+from common.parser import parse_links_as_books, process_page
+from common.workers import WORKERS, WorkerStats, report_utilisation
 from urls import urls
 
+# queue - отдельные процессы с общей очередью, pool - пул заранее прогретых процессов
+MODE = os.getenv("MP_MODE", "queue")
+# fork, spawn или forkserver; по умолчанию - как принято в ОС
+START_METHOD = os.getenv("MP_START_METHOD") or None
 
-def parse_and_save(url_list):
-    for url in url_list:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        process_page(response.text)
+# Запись о странице в общей памяти: книг, секунд на загрузку, разбор и запись (-1 книг - ошибка)
+RECORD = struct.Struct("iddd")
+STARTUP_TIMEOUT = 120
+_results = None
 
 
-def main():
+def worker(name, url_queue, results):
+    # При spawn кэш жанров родителя не наследуется
+    warm_genre_cache()
+    stats = WorkerStats(name)
+    # None в очереди - сигнал, что URL закончились
+    for url in iter(url_queue.get, None):
+        with stats.task():
+            try:
+                html = fetch_page(url)
+            except Exception:
+                # Ошибка уже записана в fetch_policy.failures, остальные URL обрабатываем дальше
+                continue
+            if html is not None:
+                with ingesting(url):
+                    process_page(html)
+    stats.finish()
+    # У каждого процесса свой журнал ошибок
+    report_failures()
+    results.put(stats)
+
+
+def init_pool_worker(results_name, ready, errors):
+    """Прогрев процесса пула: один движок БД на процесс и открытое соединение до первой задачи.
+
+    Если прогрев не удался (например, БД недоступна), ошибка уходит родителю
+    через errors, а барьер ломается - родитель сразу узнаёт настоящую причину,
+    а не ждёт STARTUP_TIMEOUT, пока пул перезапускает падающие процессы.
+    """
+    global _results
+    try:
+        # При fork движок унаследован от родителя, его соединения использовать нельзя
+        sync_engine.dispose(close=False)
+        warm_genre_cache()
+        _results = shared_memory.SharedMemory(name=results_name)
+    except Exception:
+        errors.put(traceback.format_exc())
+        ready.abort()
+        raise
+    ready.wait()
+
+
+def wait_for_pool(ready, errors):
+    """Ждёт прогрева всех процессов пула; при ошибке в любом из них бросает RuntimeError"""
+    try:
+        ready.wait(timeout=STARTUP_TIMEOUT)
+    except threading.BrokenBarrierError:
+        try:
+            error = errors.get(timeout=1)
+        except queue.Empty:
+            error = f"процессы не запустились за {STARTUP_TIMEOUT} секунд"
+        raise RuntimeError(f"Пул процессов не запустился:\n{error}") from None
+
+
+def pool_task(task):
+    """Обрабатывает страницу и пишет итог в общую память; через pipe возвращается только номер"""
+    index, url = task
+    books, fetch_time, parse_time, save_time = -1, 0.0, 0.0, 0.0
+    started = time.perf_counter()
+    try:
+        html = fetch_page(url)
+        fetch_time = time.perf_counter() - started
+        books = 0
+        if html is not None:
+            with ingesting(url):
+                started = time.perf_counter()
+                books_data = parse_links_as_books(html)
+                parse_time = time.perf_counter() - started
+                started = time.perf_counter()
+                if books_data:
+                    save_books(books_data)
+                save_time = time.perf_counter() - started
+            books = len(books_data)
+    except Exception as e:
+        print(f"[POOL] Ошибка на {url}: {e}")
+        books = -1
+    RECORD.pack_into(_results.buf, index * RECORD.size, books, fetch_time, parse_time, save_time)
+    return index
+
+
+def main_pool(context):
+    results = shared_memory.SharedMemory(create=True, size=RECORD.size * max(1, len(urls)))
+    try:
+        start_time = time.time()
+        ready = context.Barrier(WORKERS + 1)
+        errors = context.Queue()
+        pool = context.Pool(WORKERS, initializer=init_pool_worker, initargs=(results.name, ready, errors))
+        with pool:
+            # Дожидаемся, пока все процессы запустятся, импортируют модули и подключатся к БД
+            wait_for_pool(ready, errors)
+            startup = time.time() - start_time
+
+            work_start = time.time()
+            for _ in pool.imap_unordered(pool_task, enumerate(urls)):
+                pass
+            work = time.time() - work_start
+
+        records = [RECORD.unpack_from(results.buf, i * RECORD.size) for i in range(len(urls))]
+    finally:
+        results.close()
+        results.unlink()
+
+    done = [record for record in records if record[0] >= 0]
+    print(f"Запуск пула ({context.get_start_method()}, импорт, подключение к БД): {startup:.2f} секунд")
+    print(f"Работа: {work:.2f} секунд, страниц: {len(done)}, ошибок: {len(records) - len(done)}, "
+          f"книг: {sum(record[0] for record in done)}")
+    if done:
+        for title, column in (("загрузка", 1), ("разбор", 2), ("запись", 3)):
+            print(f"  {title}: {sum(record[column] for record in done) / len(done) * 1000:.1f} мс на страницу")
+
+
+def main_queue(context):
+    url_queue = context.Queue()
+    results = context.Queue()
+    for url in urls:
+        url_queue.put(url)
+    for _ in range(WORKERS):
+        url_queue.put(None)
+
     start_time = time.time()
-    num_processes = 4
-    chunk_size = (len(urls) + num_processes - 1) // num_processes
-    chunks = [urls[i:i + chunk_size] for i in range(0, len(urls), chunk_size)]
     processes = []
-
-    for chunk in chunks:
-        process = multiprocessing.Process(target=parse_and_save, args=(chunk,))
+    for i in range(WORKERS):
+        process = context.Process(target=worker, args=(f"process-{i}", url_queue, results))
         processes.append(process)
         process.start()
 
+    # Забираем статистику до join, иначе процесс может зависнуть на непрочитанной очереди
+    stats = [results.get() for _ in processes]
     for process in processes:
         process.join()
 
-    print(f"Количество процессов: {num_processes}")
+    report_utilisation(sorted(stats, key=lambda worker_stats: worker_stats.name), start_time)
+
+
+def main():
+    # Индекс жанров создаёт только родитель, до запуска воркеров
+    warm_genre_cache()
+    # Соединение прогрева не должно достаться воркерам через fork
+    sync_engine.dispose()
+    start_time = time.time()
+    context = multiprocessing.get_context(START_METHOD)
+    if MODE == "pool":
+        main_pool(context)
+    else:
+        main_queue(context)
+
+    print(f"Количество процессов: {WORKERS}, режим: {MODE}")
     print(f"Время выполнения при помощи multiprocessing: {time.time() - start_time:.2f} секунд")
 
 
@@ -0,0 +1,24 @@
+import asyncio
+import time
+
+from common.db import save_books_async, warm_genre_cache
+from common.fetch import report_failures
+from common.parser import parse_links_as_books
+from common.pipeline import Pipeline
+from urls import urls
+
+
+async def main():
+    warm_genre_cache()
+    start_time = time.time()
+    pipeline = Pipeline(parse_links_as_books, save_books_async)
+    stats = await pipeline.run(urls)
+
+    report_failures()
+    print(f"Загрузчиков: {pipeline.fetchers}, процессов разбора: {pipeline.parsers}")
+    print(f"Страниц: {stats['pages']}, книг: {stats['books']}, пачек записи: {stats['batches']}")
+    print(f"Время выполнения при помощи asyncio + ProcessPoolExecutor: {time.time() - start_time:.2f} секунд")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,34 +1,53 @@
+import queue
 import threading
 import time
 
-import requests
-
+from common.db import warm_genre_cache
+from common.fetch import fetch_page, ingesting, report_failures
 from common.parser import process_page
+from common.workers import WORKERS, WorkerStats, report_utilisation
 from urls import urls
 
 
-def parse_and_save(url_list):
-    for url in url_list:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        process_page(response.text, url=url)
+def worker(url_queue, stats):
+    # Каждый поток берёт следующий URL из общей очереди: медленная страница не держит чужие
+    while True:
+        try:
+            url = url_queue.get_nowait()
+        except queue.Empty:
+            break
+        with stats.task():
+            try:
+                html = fetch_page(url)
+            except Exception:
+                # Ошибка уже записана в fetch_policy.failures, остальные URL обрабатываем дальше
+                continue
+            if html is not None:
+                with ingesting(url):
+                    process_page(html, url=url)
+    stats.finish()
 
 
 def main():
-    num_threads = 4
+    warm_genre_cache()
+    num_threads = WORKERS
     start_time = time.time()
-    chunk_size = (len(urls) + num_threads - 1) // num_threads
-    chunks = [urls[i:i + chunk_size] for i in range(0, len(urls), chunk_size)]
+    url_queue = queue.Queue()
+    for url in urls:
+        url_queue.put(url)
 
+    stats = [WorkerStats(f"thread-{i}") for i in range(num_threads)]
     threads = []
-    for chunk in chunks:
-        thread = threading.Thread(target=parse_and_save, args=(chunk,))
+    for worker_stats in stats:
+        thread = threading.Thread(target=worker, args=(url_queue, worker_stats))
         threads.append(thread)
         thread.start()
 
     for thread in threads:
         thread.join()
 
+    report_failures()
+    report_utilisation(stats, start_time)
     print(f"Количество потоков: {num_threads}")
     print(f"Время выполнения при помощи threading: {time.time() - start_time:.2f} секунд")
 
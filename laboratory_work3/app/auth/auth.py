@@ -1,24 +1,33 @@
 import datetime
+import os
+import time
 
 import jwt
 from fastapi import Security, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from passlib.context import CryptContext
 from starlette import status
 
+from utils.cache import TTLCache
+from auth.hashing import hasher_from_env
 from repos.user_repos import find_user
 
 
 class AuthHandler:
     security = HTTPBearer()
-    pwd_context = CryptContext(schemes=['bcrypt'])
+    hasher = hasher_from_env()
     secret = 'supersecret'
+    # token -> email и email -> User, чтобы не ходить в БД на каждый запрос
+    token_cache = TTLCache(int(os.getenv('AUTH_CACHE_SIZE', 1024)), int(os.getenv('AUTH_CACHE_TTL', 60)))
+    user_cache = TTLCache(int(os.getenv('AUTH_CACHE_SIZE', 1024)), int(os.getenv('AUTH_CACHE_TTL', 60)))
 
-    def get_password_hash(self, password):
-        return self.pwd_context.hash(password)
+    async def get_password_hash(self, password):
+        return await self.hasher.hash(password)
 
-    def verify_password(self, pwd, hashed_pwd):
-        return self.pwd_context.verify(pwd, hashed_pwd)
+    async def verify_password(self, pwd, hashed_pwd):
+        return await self.hasher.verify(pwd, hashed_pwd)
+
+    async def verify_and_update_password(self, pwd, hashed_pwd):
+        return await self.hasher.verify_and_update(pwd, hashed_pwd)
 
     def encode_token(self, user_id):
         payload = {
@@ -29,28 +38,47 @@ class AuthHandler:
 
         return jwt.encode(payload, self.secret, algorithm='HS256')
 
-    def decode_token(self, token):
+    def decode_payload(self, token):
         try:
-            payload = jwt.decode(token, self.secret, algorithms=['HS256'])
-            return payload['sub']
+            return jwt.decode(token, self.secret, algorithms=['HS256'])
 
         except jwt.ExpiredSignatureError:
             raise HTTPException(status_code=401, detail='Expired signature')
         except jwt.InvalidTokenError:
             raise HTTPException(status_code=401, detail='Invalid token')
 
+    def decode_token(self, token):
+        return self.decode_payload(token)['sub']
+
+    def decode_token_cached(self, token):
+        email = self.token_cache.get(token)
+        if email is None:
+            payload = self.decode_payload(token)
+            email = payload['sub']
+            # Запись не должна пережить сам токен
+            self.token_cache.set(token, email, ttl=payload['exp'] - time.time())
+        return email
+
+    def invalidate_user(self, email):
+        """Сбрасывает кэш пользователя, вызывать после изменения его данных"""
+        self.user_cache.pop(email)
+        self.token_cache.pop_by_value(email)
+
     def auth_wrapper(self, auth: HTTPAuthorizationCredentials = Security(security)):
         return self.decode_token(auth.credentials)
 
-    def get_current_user(self, auth: HTTPAuthorizationCredentials = Security(security)):
+    async def get_current_user(self, auth: HTTPAuthorizationCredentials = Security(security)):
         credentials_exception = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail='Could not validate credentials'
         )
-        email = self.decode_token(auth.credentials)
+        email = self.decode_token_cached(auth.credentials)
         if email is None:
             raise credentials_exception
-        user = find_user(email)
+        user = self.user_cache.get(email)
         if user is None:
-            raise credentials_exception
-        return user
\ No newline at end of file
+            user = await find_user(email)
+            if user is None:
+                raise credentials_exception
+            self.user_cache.set(email, user)
+        return user
@@ -0,0 +1,66 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from starlette import status
+
+
+def make_pwd_context(rounds):
+    # min/max совпадают с rounds, чтобы хеши с любой другой стоимостью
+    # помечались как устаревшие и перехешировались при входе
+    return CryptContext(
+        schemes=['bcrypt'],
+        bcrypt__rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+class PasswordHasher:
+    """Выполняет bcrypt в отдельном пуле потоков, не блокируя event loop.
+
+    bcrypt отпускает GIL, поэтому потоки считают хеши параллельно. Если в
+    очереди уже max_pending операций, новые запросы сразу получают 429.
+    """
+
+    def __init__(self, rounds, max_workers, max_pending):
+        self.pwd_context = make_pwd_context(rounds)
+        self.max_pending = max_pending
+        self._pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bcrypt')
+
+    async def _run(self, func, *args):
+        if self._pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail='Too many authentication requests, try again later',
+                headers={'Retry-After': '1'},
+            )
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password):
+        return await self._run(self.pwd_context.hash, password)
+
+    async def verify(self, password, hashed_password):
+        return await self._run(self.pwd_context.verify, password, hashed_password)
+
+    async def verify_and_update(self, password, hashed_password):
+        """(verified, new_hash); new_hash не None, если хеш нужно пересчитать"""
+        return await self._run(self.pwd_context.verify_and_update, password, hashed_password)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def hasher_from_env():
+    return PasswordHasher(
+        rounds=int(os.getenv('BCRYPT_ROUNDS', 12)),
+        max_workers=int(os.getenv('HASH_WORKERS', os.cpu_count() or 1)),
+        max_pending=int(os.getenv('HASH_MAX_PENDING', 64)),
+    )
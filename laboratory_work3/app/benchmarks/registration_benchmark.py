@@ -0,0 +1,70 @@
+"""Замер задержки регистрации при росте таблицы user.
+
+Запуск из каталога app (нужна та же БД, что и у приложения):
+    python -m benchmarks.registration_benchmark
+"""
+import asyncio
+import os
+import statistics
+import time
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+
+from db.connection import async_session, engine, init_db
+from model.models.models import User
+
+TABLE_SIZES = [int(n) for n in os.getenv("BENCH_TABLE_SIZES", "1000,10000,100000,1000000").split(",")]
+SAMPLES = int(os.getenv("BENCH_SAMPLES", "200"))
+
+
+async def fill_users(target):
+    """Догоняет таблицу user до target строк одним INSERT ... SELECT generate_series"""
+    async with engine.begin() as conn:
+        current = (await conn.execute(text('SELECT count(*) FROM "user"'))).scalar_one()
+        if current >= target:
+            return
+        await conn.execute(
+            text(
+                'INSERT INTO "user" (name, email, password, created_at) '
+                "SELECT 'bench', 'bench-' || g || '@example.com', 'x', now() "
+                "FROM generate_series(:start, :stop) AS g"
+            ),
+            {"start": current, "stop": target - 1},
+        )
+
+
+async def register_once(email):
+    """Тот же путь, что и в /registration, без хеширования пароля"""
+    async with async_session() as session:
+        taken = (await session.exec(select(User.id).where(User.email == email))).first()
+        if taken is not None:
+            return
+        session.add(User(name="bench", email=email, password="x"))
+        try:
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+
+
+async def main():
+    await init_db()
+    print(f"{'Пользователей':>14} | {'p50, мс':>8} | {'p99, мс':>8}")
+    for size in TABLE_SIZES:
+        await fill_users(size)
+        timings = []
+        for _ in range(SAMPLES):
+            start = time.perf_counter()
+            await register_once(f"new-{uuid.uuid4().hex}@example.com")
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p50 = statistics.median(timings)
+        p99 = timings[int(len(timings) * 0.99) - 1]
+        print(f"{size:>14} | {p50:>8.2f} | {p99:>8.2f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""Замер задержки GET /books/search на большой таблице book.
+
+Запуск из каталога app (нужна та же БД, что и у приложения, с применёнными миграциями):
+    python -m benchmarks.search_benchmark
+"""
+import asyncio
+import os
+import statistics
+import time
+
+from sqlalchemy import func, text
+from sqlmodel import select
+
+from db.connection import async_session, engine, init_db
+from repos.book_repos import SEARCH_RANK_LIMIT, search_books, search_vector
+
+BOOKS = int(os.getenv("BENCH_BOOKS", "1000000"))
+SAMPLES = int(os.getenv("BENCH_SAMPLES", "100"))
+PAGE_SIZE = 50
+BUDGET_MS = 50
+
+RU_WORDS = [
+    "война", "мир", "тайна", "город", "ночь", "море", "сердце", "дорога", "дом", "звезда",
+    "история", "любовь", "время", "тень", "огонь", "магия", "дракон", "лес", "король", "сад",
+    "вечер", "путь", "остров", "память", "зеркало", "ветер", "ключ", "письмо", "сон", "берег",
+    "чудо", "солнце", "зима", "осень", "весна", "лето", "песня", "небо", "граница", "крепость",
+]
+EN_WORDS = [
+    "shadow", "kingdom", "secret", "garden", "empire", "winter", "night", "dragon", "river", "storm",
+]
+AUTHORS = ["Иванов", "Петрова", "Смирнов", "Кузнецова", "Толстой", "Пушкин", "Orwell", "Tolkien", "King", "Austen"]
+
+QUERIES = [
+    ("частое слово", "война"),
+    ("редкое слово", "крепость"),
+    ("два слова", "тайна дракон"),
+    ("фраза", '"война мир"'),
+    ("английское", "kingdom"),
+    ("автор", "Толстой"),
+    ("номер тома", "том 123456"),
+]
+
+
+def _pick(words):
+    # Степень у random() даёт перекос: первые слова встречаются часто, последние редко
+    array = "ARRAY[" + ", ".join(f"'{word}'" for word in words) + "]"
+    return f"({array})[1 + floor({len(words)} * power(random(), 2))::int]"
+
+
+async def fill_books(target):
+    """Догоняет таблицу book до target строк одним INSERT ... SELECT generate_series"""
+    async with engine.begin() as conn:
+        current = (await conn.execute(text("SELECT count(*) FROM book"))).scalar_one()
+        if current >= target:
+            return
+        words = RU_WORDS + EN_WORDS
+        await conn.execute(
+            text(
+                "INSERT INTO book (owner_id, title, author, description, available) "
+                f"SELECT 1, {_pick(words)} || ' ' || {_pick(words)} || ' ' || {_pick(RU_WORDS)} || ' том ' || g, "
+                f"{_pick(AUTHORS)}, 'Описание: ' || {_pick(words)} || ' ' || {_pick(words)}, true "
+                "FROM generate_series(:start, :stop) AS g"
+            ),
+            {"start": current, "stop": target - 1},
+        )
+        await conn.execute(text("ANALYZE book"))
+
+
+async def count_matches(q):
+    query = func.websearch_to_tsquery("russian", q).op("||")(func.websearch_to_tsquery("english", q))
+    async with async_session() as session:
+        statement = select(func.count()).select_from(search_vector.table).where(search_vector.op("@@")(query))
+        return (await session.exec(statement)).one()
+
+
+async def measure(q, cursor=None):
+    timings = []
+    next_cursor = None
+    async with async_session() as session:
+        for _ in range(SAMPLES):
+            start = time.perf_counter()
+            _, next_cursor = await search_books(session, q, PAGE_SIZE, cursor)
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1], next_cursor
+
+
+async def main():
+    await init_db()
+    await fill_books(BOOKS)
+    print(f"Книг: {BOOKS}, страница: {PAGE_SIZE}, ранжируется не больше {SEARCH_RANK_LIMIT}, бюджет: {BUDGET_MS} мс")
+    print(f"{'Запрос':>14} | {'найдено':>8} | {'p50, мс':>8} | {'p99, мс':>8} | {'стр. 2 p50':>10}")
+    for title, q in QUERIES:
+        matches = await count_matches(q)
+        p50, p99, next_cursor = await measure(q)
+        page2 = f"{(await measure(q, next_cursor))[0]:>10.2f}" if next_cursor else f"{'-':>10}"
+        mark = "" if p99 <= BUDGET_MS else "  <- вне бюджета"
+        print(f"{title:>14} | {matches:>8} | {p50:>8.2f} | {p99:>8.2f} | {page2}{mark}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+import asyncio
+import os
+from typing import Optional
+
+import aiohttp
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def _connector():
+    return aiohttp.TCPConnector(
+        limit=int(os.getenv("HTTP_POOL_LIMIT", 100)),
+        limit_per_host=int(os.getenv("HTTP_LIMIT_PER_HOST", 20)),
+        keepalive_timeout=float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", 30)),
+        ttl_dns_cache=int(os.getenv("HTTP_DNS_CACHE_TTL", 300)),
+    )
+
+
+async def open_http_session():
+    """Общая сессия на весь процесс: соединения и DNS переиспользуются между запросами"""
+    global _session
+    _session = aiohttp.ClientSession(connector=_connector())
+    return _session
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    if _session is None or _session.closed:
+        raise RuntimeError("HTTP session is not open, call open_http_session() in lifespan")
+    return _session
+
+
+async def close_http_session():
+    global _session
+    if _session is not None:
+        await _session.close()
+        # Даём закрыться TLS-соединениям, иначе aiohttp пишет предупреждения
+        await asyncio.sleep(0.25)
+        _session = None
@@ -1,37 +1,46 @@
+import asyncio
 import os
-from datetime import time
 
 from dotenv import load_dotenv
+from sqlalchemy import func, text
 from sqlalchemy.exc import OperationalError
-from sqlmodel import SQLModel, Session, create_engine, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from db.engine_config import engine_options
 
 load_dotenv()
 db_url = (
-    f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
+    f"postgresql+asyncpg://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
     f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
 )
-engine = create_engine(db_url, echo=True)
+engine = create_async_engine(db_url, **engine_options(db_url))
+async_session = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
 
-def init_db():
+async def init_db():
     for i in range(10):
         try:
-            SQLModel.metadata.create_all(engine)
+            async with engine.begin() as conn:
+                # Триграммные индексы Book (автодополнение) требуют расширения pg_trgm
+                await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                await conn.run_sync(SQLModel.metadata.create_all)
             # Создаем пользователя по умолчанию
-            create_default_user()
+            await create_default_user()
             break
-        except OperationalError as e:
+        except (OperationalError, OSError) as e:
             print(f"DB connection failed. Retrying in 3s... ({i + 1}/10)")
-            time.sleep(3)
+            await asyncio.sleep(3)
 
 
-def create_default_user():
+async def create_default_user():
     """Создает пользователя по умолчанию, если его нет"""
     from model.models.models import User
-    
-    with Session(engine) as session:
+
+    async with async_session() as session:
         statement = select(User).where(User.id == 1)
-        user = session.exec(statement).first()
+        user = (await session.exec(statement)).first()
         if not user:
             user = User(
                 id=1,
@@ -40,10 +49,14 @@ def create_default_user():
                 password="default_password"
             )
             session.add(user)
-            session.commit()
+            await session.flush()
+            # id задан явно - сдвигаем последовательность, иначе первая регистрация получит id=1
+            sequence = func.pg_get_serial_sequence('"user"', "id")
+            await session.exec(select(func.setval(sequence, select(func.max(User.id)).scalar_subquery())))
+            await session.commit()
             print("Created default user")
 
 
-def get_session():
-    with Session(engine) as session:
+async def get_session():
+    async with async_session() as session:
         yield session
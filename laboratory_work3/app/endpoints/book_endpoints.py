@@ -1,27 +1,40 @@
 import os
-from typing import List
+from typing import Optional
 
 import aiohttp
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from utils.cache import TTLCache
+from clients.http_session import get_http_session
 from db.connection import get_session
 from endpoints.user_endpoints import auth_handler
 from model.models.models import User, Book
-from model.schemas.book import BookRead, BookCreate, BookUpdate
+from model.schemas.book import BookRead, BookCreate, BookUpdate, BookPage, BookSearchPage, BookAutocomplete
 from model.schemas.parse import ParseRequest
+from repos.book_repos import autocomplete_books, search_books
+from repos.load_options import load_options, reload
 
 book_router = APIRouter()
 
+PARSER_URL = os.getenv("PARSER_URL", "http://0.0.0.0:8001/parse")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+AUTOCOMPLETE_BUDGET_MS = int(os.getenv("AUTOCOMPLETE_BUDGET_MS", 100))
+# Подсказки для популярных префиксов отдаются из памяти, без запроса к БД
+autocomplete_cache = TTLCache(int(os.getenv("AUTOCOMPLETE_CACHE_SIZE", 1024)), int(os.getenv("AUTOCOMPLETE_CACHE_TTL", 60)))
+QUERY_CANCELED = "57014"
 
-@book_router.post("/parse")
+
+@book_router.post("/parse", status_code=202)
 async def parse(parse_request: ParseRequest):
-    parser_url = os.getenv("PARSER_URL", "http://0.0.0.0:8001/parse")
+    """Ставит URL в очередь парсера и сразу возвращает задачу с её id"""
     try:
-        async with aiohttp.ClientSession() as client:
-            response = await client.post(
-                parser_url, json=parse_request.model_dump(), timeout=15
-            )
+        async with get_http_session().post(
+            PARSER_URL, json=parse_request.model_dump(), timeout=15
+        ) as response:
             response.raise_for_status()
             return await response.json()
     except aiohttp.ClientError as e:
@@ -30,52 +43,128 @@ async def parse(parse_request: ParseRequest):
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 
+@book_router.get("/parse/{job_id}")
+async def get_parse_job(job_id: int):
+    try:
+        async with get_http_session().get(f"{PARSER_URL}/{job_id}", timeout=15) as response:
+            if response.status == 404:
+                raise HTTPException(status_code=404, detail="Parse job not found")
+            response.raise_for_status()
+            return await response.json()
+    except aiohttp.ClientError as e:
+        raise HTTPException(status_code=500, detail=f"Parser service error: {str(e)}")
+
+
 @book_router.post("/", response_model=BookRead)
-def create_book(
+async def create_book(
     book: BookCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(auth_handler.get_current_user),
 ):
     db_book = Book(**book.model_dump(), owner_id=current_user.id)
     session.add(db_book)
-    session.commit()
-    session.refresh(db_book)
-    return db_book
+    await session.commit()
+    return await reload(session, db_book, BookRead)
 
 
-@book_router.get("/", response_model=List[BookRead])
-def get_books(session: Session = Depends(get_session)):
-    return session.exec(select(Book)).all()
+@book_router.get("/", response_model=BookPage)
+async def get_books(
+    cursor: Optional[int] = Query(None, description="id последней книги предыдущей страницы"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    genre_id: Optional[int] = None,
+    owner_id: Optional[int] = None,
+    available: Optional[bool] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    author: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+):
+    statement = select(Book).options(*load_options(BookRead))
+    if cursor is not None:
+        statement = statement.where(Book.id > cursor)
+    if genre_id is not None:
+        statement = statement.where(Book.genre_id == genre_id)
+    if owner_id is not None:
+        statement = statement.where(Book.owner_id == owner_id)
+    if available is not None:
+        statement = statement.where(Book.available == available)
+    if year_from is not None:
+        statement = statement.where(Book.year >= year_from)
+    if year_to is not None:
+        statement = statement.where(Book.year <= year_to)
+    if author is not None:
+        statement = statement.where(Book.author == author)
+
+    # Берём на одну запись больше, чтобы понять, есть ли следующая страница
+    books = (await session.exec(statement.order_by(Book.id).limit(limit + 1))).all()
+    next_cursor = books[limit - 1].id if len(books) > limit else None
+    return {"items": books[:limit], "next_cursor": next_cursor}
+
+
+@book_router.get("/search", response_model=BookSearchPage)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="запрос в синтаксисе websearch: слова, \"фраза\", -исключить"),
+    cursor: Optional[str] = Query(None, description="next_cursor предыдущей страницы"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(get_session),
+):
+    try:
+        books, next_cursor = await search_books(session, q, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"items": books, "next_cursor": next_cursor}
+
+
+@book_router.get("/autocomplete", response_model=BookAutocomplete)
+async def autocomplete(
+    q: str = Query(..., min_length=3, max_length=100, description="начало названия или автора, от 3 символов"),
+    limit: int = Query(10, ge=1, le=20),
+    session: AsyncSession = Depends(get_session),
+):
+    # Короче трёх символов триграммный индекс не помогает, поэтому min_length=3
+    key = (" ".join(q.split()).casefold(), limit)
+    items = autocomplete_cache.get(key)
+    if items is not None:
+        return {"items": items}
+    try:
+        items = await autocomplete_books(session, key[0], limit, AUTOCOMPLETE_BUDGET_MS)
+    except DBAPIError as e:
+        if getattr(e.orig, "sqlstate", None) != QUERY_CANCELED:
+            raise
+        # Бюджет исчерпан: пустой ответ лучше, чем подсказка, пришедшая после следующего нажатия
+        await session.rollback()
+        return {"items": [], "timed_out": True}
+    autocomplete_cache.set(key, items)
+    return {"items": items}
 
 
 @book_router.get("/{book_id}", response_model=BookRead)
-def get_book(book_id: int, session: Session = Depends(get_session)):
-    book = session.get(Book, book_id)
+async def get_book(book_id: int, session: AsyncSession = Depends(get_session)):
+    book = await session.get(Book, book_id, options=load_options(BookRead))
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
     return book
 
 
 @book_router.delete("/{book_id}", response_model=dict)
-def delete_book(book_id: int, session: Session = Depends(get_session)):
-    book = session.get(Book, book_id)
+async def delete_book(book_id: int, session: AsyncSession = Depends(get_session)):
+    book = await session.get(Book, book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
-    session.delete(book)
-    session.commit()
+    await session.delete(book)
+    await session.commit()
     return {"ok": True}
 
 
 @book_router.patch("/{book_id}", response_model=BookRead)
-def update_book(
-    book_id: int, update: BookUpdate, session: Session = Depends(get_session)
+async def update_book(
+    book_id: int, update: BookUpdate, session: AsyncSession = Depends(get_session)
 ):
-    book = session.get(Book, book_id)
+    book = await session.get(Book, book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
     update_data = update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(book, key, value)
-    session.commit()
-    session.refresh(book)
-    return book
+    await session.commit()
+    return await reload(session, book, BookRead)
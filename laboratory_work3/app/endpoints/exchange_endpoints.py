@@ -1,52 +1,70 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
 
 from db.connection import get_session
-from model.models.models import ExchangeRequest
-from model.schemas.exchange_request import ExchangeRequestCreate, ExchangeRequestRead
+from endpoints.user_endpoints import auth_handler
+from model.models.models import ExchangeRequest, User
+from model.schemas.exchange_request import ExchangeRequestCreate, ExchangeRequestRead, ExchangeSuggestion
+from repos.exchange_repos import find_suggestions
+from repos.load_options import load_options, reload
 
 exchange_router = APIRouter()
 
+# Сколько самых заинтересованных пользователей рассматривать на каждый мой жанр
+SUGGESTIONS_FANOUT = int(os.getenv("SUGGESTIONS_FANOUT", 200))
+
 
 @exchange_router.post("/", response_model=ExchangeRequestRead)
-def create_exchange_request(data: ExchangeRequestCreate, session: Session = Depends(get_session)):
+async def create_exchange_request(data: ExchangeRequestCreate, session: AsyncSession = Depends(get_session)):
     exchange = ExchangeRequest(**data.model_dump())
     session.add(exchange)
-    session.commit()
-    session.refresh(exchange)
-    return exchange
+    await session.commit()
+    return await reload(session, exchange, ExchangeRequestRead)
 
 
 @exchange_router.get("/", response_model=List[ExchangeRequestRead])
-def get_all_exchange_requests(session: Session = Depends(get_session)):
-    return session.exec(select(ExchangeRequest)).all()
+async def get_all_exchange_requests(session: AsyncSession = Depends(get_session)):
+    statement = select(ExchangeRequest).options(*load_options(ExchangeRequestRead))
+    return (await session.exec(statement)).all()
+
+
+@exchange_router.get("/suggestions", response_model=List[ExchangeSuggestion])
+async def get_exchange_suggestions(
+    limit: int = Query(10, ge=1, le=50),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(auth_handler.get_current_user),
+):
+    """Пользователи, с которыми возможен взаимный обмен, по убыванию суммарного интереса"""
+    return await find_suggestions(session, current_user.id, limit, SUGGESTIONS_FANOUT)
 
 
 @exchange_router.get("/{exchange_id}", response_model=ExchangeRequestRead)
-def get_exchange_request(exchange_id: int, session: Session = Depends(get_session)):
-    exchange = session.get(ExchangeRequest, exchange_id)
+async def get_exchange_request(exchange_id: int, session: AsyncSession = Depends(get_session)):
+    exchange = await session.get(ExchangeRequest, exchange_id, options=load_options(ExchangeRequestRead))
     if not exchange:
         raise HTTPException(status_code=404, detail="Exchange request not found")
     return exchange
 
 
 @exchange_router.delete("/{exchange_id}", response_model=dict)
-def delete_exchange_request(exchange_id: int, session: Session = Depends(get_session)):
-    exchange = session.get(ExchangeRequest, exchange_id)
+async def delete_exchange_request(exchange_id: int, session: AsyncSession = Depends(get_session)):
+    exchange = await session.get(ExchangeRequest, exchange_id)
     if not exchange:
         raise HTTPException(status_code=404, detail="Exchange request not found")
-    session.delete(exchange)
-    session.commit()
+    await session.delete(exchange)
+    await session.commit()
     return {"ok": True}
 
 
 @exchange_router.patch("/{exchange_id}/status", response_model=ExchangeRequestRead)
-def update_exchange_status(exchange_id: int, status: str, session: Session = Depends(get_session)):
-    exchange = session.get(ExchangeRequest, exchange_id)
+async def update_exchange_status(exchange_id: int, status: str, session: AsyncSession = Depends(get_session)):
+    exchange = await session.get(ExchangeRequest, exchange_id)
     if not exchange:
         raise HTTPException(status_code=404, detail="Exchange request not found")
     exchange.status = status
-    session.commit()
-    session.refresh(exchange)
-    return exchange
+    await session.commit()
+    return await reload(session, exchange, ExchangeRequestRead)
@@ -1,7 +1,9 @@
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from db.connection import get_session
 from model.models.models import Genre
@@ -9,46 +11,59 @@ from model.schemas.genre import GenreRead, GenreCreate, GenreUpdate
 
 genre_router = APIRouter()
 
+UNIQUE_VIOLATION = "23505"
+
+
+async def commit_genre(session):
+    """commit с ответом 400, если жанр с таким именем уже есть"""
+    try:
+        await session.commit()
+    except IntegrityError as e:
+        await session.rollback()
+        if getattr(e.orig, "sqlstate", None) != UNIQUE_VIOLATION:
+            raise
+        raise HTTPException(status_code=400, detail="Genre already exists")
+
 
 @genre_router.post("/", response_model=GenreRead)
-def create_genre(genre: GenreCreate, session: Session = Depends(get_session)):
+async def create_genre(genre: GenreCreate, session: AsyncSession = Depends(get_session)):
     db_genre = Genre(**genre.model_dump())
     session.add(db_genre)
-    session.commit()
-    session.refresh(db_genre)
+    await commit_genre(session)
+    await session.refresh(db_genre)
     return db_genre
 
 
 @genre_router.get("/", response_model=List[GenreRead])
-def get_all_genres(session: Session = Depends(get_session)):
-    return session.exec(select(Genre)).all()
+async def get_all_genres(session: AsyncSession = Depends(get_session)):
+    return (await session.exec(select(Genre))).all()
 
 
 @genre_router.get("/{genre_id}", response_model=GenreRead)
-def get_genre(genre_id: int, session: Session = Depends(get_session)):
-    genre = session.get(Genre, genre_id)
+async def get_genre(genre_id: int, session: AsyncSession = Depends(get_session)):
+    genre = await session.get(Genre, genre_id)
     if not genre:
         raise HTTPException(status_code=404, detail="Genre not found")
     return genre
 
 
 @genre_router.delete("/{genre_id}", response_model=dict)
-def delete_genre(genre_id: int, session: Session = Depends(get_session)):
-    genre = session.get(Genre, genre_id)
+async def delete_genre(genre_id: int, session: AsyncSession = Depends(get_session)):
+    genre = await session.get(Genre, genre_id)
     if not genre:
         raise HTTPException(status_code=404, detail="Genre not found")
-    session.delete(genre)
-    session.commit()
+    await session.delete(genre)
+    await session.commit()
     return {"ok": True}
 
 @genre_router.patch("/{genre_id}", response_model=GenreRead)
-def update_genre(genre_id: int, update: GenreUpdate, session: Session = Depends(get_session)):
-    genre = session.get(Genre, genre_id)
+async def update_genre(genre_id: int, update: GenreUpdate, session: AsyncSession = Depends(get_session)):
+    genre = await session.get(Genre, genre_id)
     if not genre:
         raise HTTPException(status_code=404, detail="Genre not found")
     update_data = update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(genre, key, value)
-    session.commit()
-    session.refresh(genre)
+    await commit_genre(session)
+    await session.refresh(genre)
     return genre
\ No newline at end of file
@@ -1,5 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlmodel import Session, select
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from starlette.responses import JSONResponse
 from starlette.status import HTTP_201_CREATED
 from typing_extensions import List
@@ -8,57 +10,85 @@ from auth.auth import AuthHandler
 from model.models.models import User
 from model.schemas.user import UserCreate, UserLogin, UserRead, UserPasswordChange
 from db.connection import get_session
-from repos.user_repos import select_all_users, find_user
+from repos.load_options import load_options
+from repos.user_repos import find_user
 
 user_router = APIRouter()
 auth_handler = AuthHandler()
 
+UNIQUE_VIOLATION = "23505"
+EMAIL_INDEX = "ix_user_email"
+
+
+def is_email_taken(error: IntegrityError) -> bool:
+    """Нарушена именно уникальность email, а не другое ограничение"""
+    if getattr(error.orig, "sqlstate", None) != UNIQUE_VIOLATION:
+        return False
+    # asyncpg кладёт имя ограничения в исходное исключение драйвера
+    constraint = getattr(error.orig.__cause__, "constraint_name", None)
+    return constraint == EMAIL_INDEX
+
 
 @user_router.post('/registration', status_code=201, tags=['users'],
                   description='Register new user')
-def register(user: UserCreate, session=Depends(get_session)):
-    users = select_all_users()
-    if any(u.email == user.email for u in users):
+async def register(user: UserCreate, session=Depends(get_session)):
+    email_taken = (await session.exec(select(User.id).where(User.email == user.email))).first()
+    if email_taken is not None:
         raise HTTPException(status_code=400, detail='Email is taken')
-    hashed_pwd = auth_handler.get_password_hash(user.password)
+    hashed_pwd = await auth_handler.get_password_hash(user.password)
     u = User(email=user.email, password=hashed_pwd, name=user.name, bio=user.bio)
     session.add(u)
-    session.commit()
+    try:
+        await session.commit()
+    except IntegrityError as e:
+        await session.rollback()
+        if not is_email_taken(e):
+            raise
+        # Параллельная регистрация с тем же email успела раньше
+        raise HTTPException(status_code=400, detail='Email is taken')
     return JSONResponse(status_code=HTTP_201_CREATED, content={"Message": "User Registered"})
 
 
 @user_router.post('/login', tags=['users'])
-def login(user: UserLogin):
-    user_found = find_user(user.email)
+async def login(user: UserLogin, session: AsyncSession = Depends(get_session)):
+    user_found = await find_user(user.email)
     if not user_found:
         raise HTTPException(status_code=401, detail='Invalid email and/or password')
-    verified = auth_handler.verify_password(user.password, user_found.password)
+    verified, new_hash = await auth_handler.verify_and_update_password(user.password, user_found.password)
     if not verified:
         raise HTTPException(status_code=401, detail='Invalid email and/or password')
+    if new_hash:
+        # Хеш посчитан с другой стоимостью bcrypt - пересохраняем с текущей
+        db_user = await session.get(User, user_found.id)
+        db_user.password = new_hash
+        await session.commit()
+        auth_handler.invalidate_user(db_user.email)
     token = auth_handler.encode_token(user_found.email)
     return {'token': token}
 
 
 @user_router.get('/users/me', tags=['users'])
-def get_current_user(user: User = Depends(auth_handler.get_current_user)):
+async def get_current_user(user: User = Depends(auth_handler.get_current_user)):
     return user
 
 
 @user_router.get("/users", response_model=List[UserRead], tags=['users'])
-def get_users(session: Session = Depends(get_session)):
-    return session.exec(select(User)).all()
+async def get_users(session: AsyncSession = Depends(get_session)):
+    return (await session.exec(select(User).options(*load_options(UserRead)))).all()
 
 
 @user_router.post("/change-password", tags=['users'])
-def change_password(
+async def change_password(
         data: UserPasswordChange,
-        session: Session = Depends(get_session),
+        session: AsyncSession = Depends(get_session),
         current_user: User = Depends(auth_handler.get_current_user)
 ):
-    if not auth_handler.verify_password(data.old_password, current_user.password):
+    if not await auth_handler.verify_password(data.old_password, current_user.password):
         raise HTTPException(status_code=400, detail="Incorrect old password")
 
-    current_user.password = auth_handler.get_password_hash(data.new_password)
-    session.add(current_user)
-    session.commit()
+    # current_user может лежать в кэше авторизации, поэтому меняем копию из своей сессии
+    user = await session.get(User, current_user.id)
+    user.password = await auth_handler.get_password_hash(data.new_password)
+    await session.commit()
+    auth_handler.invalidate_user(user.email)
     return {"message": "Password updated successfully"}
@@ -4,18 +4,23 @@ import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from db.connection import init_db
+from clients.http_session import close_http_session, open_http_session
+from db.connection import engine, init_db
+from db.engine_config import pool_stats
 from endpoints.book_endpoints import book_router
 from endpoints.exchange_endpoints import exchange_router
 from endpoints.genre_endpoints import genre_router
-from endpoints.user_endpoints import user_router
+from endpoints.user_endpoints import auth_handler, user_router
 from endpoints.user_genre_endpoints import user_genre_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    init_db()
+    await init_db()
+    await open_http_session()
     yield
+    await close_http_session()
+    auth_handler.hasher.shutdown()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -35,5 +40,10 @@ app.include_router(book_router, prefix="/books", tags=["books"])
 app.include_router(user_genre_router, prefix="/user/genres", tags=["user genres"])
 app.include_router(exchange_router, prefix="/requests", tags=["exchange requests"])
 
+
+@app.get("/metrics/db-pool", tags=["metrics"])
+async def db_pool_metrics():
+    return pool_stats(engine.pool)
+
 if __name__ == '__main__':
     uvicorn.run('main:app', host="localhost", port=8000, reload=True)
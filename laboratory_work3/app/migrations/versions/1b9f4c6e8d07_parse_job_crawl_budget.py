@@ -0,0 +1,34 @@
+"""parse job crawl budget
+
+Revision ID: 1b9f4c6e8d07
+Revises: e5b8a3f71c29
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b9f4c6e8d07'
+down_revision: Union[str, None] = 'e5b8a3f71c29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('parsejob', sa.Column('max_pages', sa.INTEGER(), server_default='1', nullable=False))
+    op.add_column('parsejob', sa.Column('max_depth', sa.INTEGER(), server_default='0', nullable=False))
+    op.add_column('parsejob', sa.Column('pages_done', sa.INTEGER(), nullable=True))
+    op.add_column('parsejob', sa.Column('updated_at', sa.TIMESTAMP(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('parsejob', 'updated_at')
+    op.drop_column('parsejob', 'pages_done')
+    op.drop_column('parsejob', 'max_depth')
+    op.drop_column('parsejob', 'max_pages')
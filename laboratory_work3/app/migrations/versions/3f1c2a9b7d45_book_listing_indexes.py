@@ -0,0 +1,36 @@
+"""book listing indexes
+
+Revision ID: 3f1c2a9b7d45
+Revises: 0db06caf6570
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a9b7d45'
+down_revision: Union[str, None] = '0db06caf6570'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_book_genre_id_id', 'book', ['genre_id', 'id'], unique=False)
+    op.create_index('ix_book_owner_id_id', 'book', ['owner_id', 'id'], unique=False)
+    op.create_index('ix_book_available_id', 'book', ['available', 'id'], unique=False)
+    op.create_index('ix_book_year_id', 'book', ['year', 'id'], unique=False)
+    op.create_index('ix_book_author_id', 'book', ['author', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_book_author_id', table_name='book')
+    op.drop_index('ix_book_year_id', table_name='book')
+    op.drop_index('ix_book_available_id', table_name='book')
+    op.drop_index('ix_book_owner_id_id', table_name='book')
+    op.drop_index('ix_book_genre_id_id', table_name='book')
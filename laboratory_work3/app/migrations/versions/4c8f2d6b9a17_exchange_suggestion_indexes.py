@@ -0,0 +1,32 @@
+"""exchange suggestion indexes
+
+Revision ID: 4c8f2d6b9a17
+Revises: 9e2b4f6a1c83
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c8f2d6b9a17'
+down_revision: Union[str, None] = '9e2b4f6a1c83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_usergenre_genre_level', 'usergenre',
+                    ['genre_id', sa.text('preference_level DESC NULLS LAST'), 'user_id'], unique=False)
+    op.create_index('ix_book_available_owner_genre', 'book', ['owner_id', 'genre_id', 'id'], unique=False,
+                    postgresql_where=sa.text('available'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_book_available_owner_genre', table_name='book', postgresql_where=sa.text('available'))
+    op.drop_index('ix_usergenre_genre_level', table_name='usergenre')
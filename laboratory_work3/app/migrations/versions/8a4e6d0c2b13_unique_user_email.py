@@ -0,0 +1,37 @@
+"""unique user email
+
+Revision ID: 8a4e6d0c2b13
+Revises: 3f1c2a9b7d45
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4e6d0c2b13'
+down_revision: Union[str, None] = '3f1c2a9b7d45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Индекс не создастся, пока в таблице есть одинаковые email. Адрес оставляем
+    # самому старому пользователю, остальным дописываем префикс с их id -
+    # удалить их нельзя, на них ссылаются книги и заявки.
+    op.execute(
+        """
+        UPDATE "user" SET email = 'duplicate-' || id || '-' || email
+        WHERE id NOT IN (SELECT min(id) FROM "user" GROUP BY email)
+        """
+    )
+    op.create_index(op.f('ix_user_email'), 'user', ['email'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_email'), table_name='user')
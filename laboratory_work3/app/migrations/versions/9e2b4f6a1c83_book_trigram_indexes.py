@@ -0,0 +1,34 @@
+"""book trigram indexes
+
+Revision ID: 9e2b4f6a1c83
+Revises: 5d3a7c1e9b26
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e2b4f6a1c83'
+down_revision: Union[str, None] = '5d3a7c1e9b26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_book_title_trgm', 'book', ['title'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.create_index('ix_book_author_trgm', 'book', ['author'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'author': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Расширение не удаляем: им могут пользоваться и другие объекты базы
+    op.drop_index('ix_book_author_trgm', table_name='book', postgresql_using='gin')
+    op.drop_index('ix_book_title_trgm', table_name='book', postgresql_using='gin')
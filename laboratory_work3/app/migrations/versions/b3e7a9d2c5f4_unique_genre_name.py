@@ -0,0 +1,58 @@
+"""unique genre name
+
+Revision ID: b3e7a9d2c5f4
+Revises: 4c8f2d6b9a17
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e7a9d2c5f4'
+down_revision: Union[str, None] = '4c8f2d6b9a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Параллельные задачи парсера могли создать один жанр несколько раз.
+    # Оставляем жанр с меньшим id, переносим на него книги и предпочтения;
+    # у пользователя остаётся наибольший уровень предпочтения среди копий.
+    op.execute(
+        """
+        CREATE TEMP TABLE genre_duplicate ON COMMIT DROP AS
+        SELECT genre.id AS duplicate_id, keep.id AS keep_id
+        FROM genre
+        JOIN (SELECT name, min(id) AS id FROM genre GROUP BY name) AS keep USING (name)
+        WHERE genre.id <> keep.id
+        """
+    )
+    op.execute(
+        """
+        UPDATE book SET genre_id = d.keep_id
+        FROM genre_duplicate d WHERE book.genre_id = d.duplicate_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO usergenre (user_id, genre_id, preference_level)
+        SELECT usergenre.user_id, d.keep_id, max(usergenre.preference_level)
+        FROM usergenre JOIN genre_duplicate d ON usergenre.genre_id = d.duplicate_id
+        GROUP BY usergenre.user_id, d.keep_id
+        ON CONFLICT (user_id, genre_id)
+        DO UPDATE SET preference_level = GREATEST(usergenre.preference_level, EXCLUDED.preference_level)
+        """
+    )
+    op.execute("DELETE FROM usergenre USING genre_duplicate d WHERE usergenre.genre_id = d.duplicate_id")
+    op.execute("DELETE FROM genre USING genre_duplicate d WHERE genre.id = d.duplicate_id")
+    op.create_index(op.f('ix_genre_name'), 'genre', ['name'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_genre_name'), table_name='genre')
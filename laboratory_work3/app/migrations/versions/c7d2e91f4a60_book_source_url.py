@@ -0,0 +1,40 @@
+"""book source url
+
+Revision ID: c7d2e91f4a60
+Revises: 8a4e6d0c2b13
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2e91f4a60'
+down_revision: Union[str, None] = '8a4e6d0c2b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('book', sa.Column('source_url', sa.VARCHAR(), nullable=True))
+    # Парсер раньше писал ссылку на litres в description; переносим её,
+    # оставляя для каждой ссылки только самую раннюю книгу-дубликат
+    op.execute(
+        "UPDATE book SET source_url = description "
+        "WHERE id IN ("
+        "  SELECT min(id) FROM book "
+        "  WHERE description LIKE 'http%/book/%' "
+        "  GROUP BY description"
+        ")"
+    )
+    op.create_index(op.f('ix_book_source_url'), 'book', ['source_url'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_book_source_url'), table_name='book')
+    op.drop_column('book', 'source_url')
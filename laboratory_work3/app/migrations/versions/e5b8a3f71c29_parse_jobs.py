@@ -0,0 +1,42 @@
+"""parse jobs
+
+Revision ID: e5b8a3f71c29
+Revises: c7d2e91f4a60
+Create Date: 2026-10-18 13:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b8a3f71c29'
+down_revision: Union[str, None] = 'c7d2e91f4a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('parsejob',
+    sa.Column('id', sa.INTEGER(), autoincrement=True, nullable=False),
+    sa.Column('url', sa.VARCHAR(), nullable=False),
+    sa.Column('status', sa.Enum('queued', 'fetching', 'saving', 'done', 'failed', name='parsejobstatus'), nullable=False),
+    sa.Column('books_found', sa.INTEGER(), nullable=True),
+    sa.Column('error', sa.VARCHAR(), nullable=True),
+    sa.Column('attempts', sa.INTEGER(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(), nullable=False),
+    sa.Column('started_at', sa.TIMESTAMP(), nullable=True),
+    sa.Column('finished_at', sa.TIMESTAMP(), nullable=True),
+    sa.PrimaryKeyConstraint('id', name='parsejob_pkey')
+    )
+    op.create_index('ix_parsejob_queued', 'parsejob', ['id'], unique=False, postgresql_where=sa.text("status = 'queued'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_parsejob_queued', table_name='parsejob', postgresql_where=sa.text("status = 'queued'"))
+    op.drop_table('parsejob')
+    sa.Enum(name='parsejobstatus').drop(op.get_bind(), checkfirst=True)
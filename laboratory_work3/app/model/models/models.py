@@ -1,13 +1,15 @@
 from datetime import datetime
 from typing import Optional, List
 from enum import Enum
+from sqlalchemy import Column, Computed, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlmodel import SQLModel, Field, Relationship
 
 
 class User(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
-    email: str
+    email: str = Field(unique=True, index=True)
     password: str
     bio: Optional[str] = None
     created_at: datetime = datetime.now()
@@ -18,15 +20,47 @@ class User(SQLModel, table=True):
     user_genres: List["UserGenre"] = Relationship(back_populates="user")
 
 
+# Названия на litres в основном русские, но встречаются и английские - индексируем в обеих конфигурациях
+BOOK_SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(author, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(author, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+)
+
+
 class Book(SQLModel, table=True):
+    # Составные индексы (фильтр, id) под keyset-пагинацию в GET /books/
+    __table_args__ = (
+        Index("ix_book_genre_id_id", "genre_id", "id"),
+        Index("ix_book_owner_id_id", "owner_id", "id"),
+        Index("ix_book_available_id", "available", "id"),
+        Index("ix_book_year_id", "year", "id"),
+        Index("ix_book_author_id", "author", "id"),
+        Index("ix_book_search_vector", "search_vector", postgresql_using="gin"),
+        # Триграммы для нечёткого автодополнения по названию и автору
+        Index("ix_book_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("ix_book_author_trgm", "author", postgresql_using="gin", postgresql_ops={"author": "gin_trgm_ops"}),
+        # Доступные книги владельца по жанрам - для подбора обменов
+        Index("ix_book_available_owner_genre", "owner_id", "genre_id", "id", postgresql_where=text("available")),
+    )
+    # search_vector есть в таблице, но в объекты не загружается: он нужен только в WHERE и ORDER BY поиска
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
+
     id: Optional[int] = Field(default=None, primary_key=True)
     owner_id: int = Field(foreign_key="user.id")
     title: str
     author: Optional[str] = None
     description: Optional[str] = None
+    source_url: Optional[str] = Field(default=None, unique=True, index=True)
     genre_id: Optional[int] = Field(default=None, foreign_key="genre.id")
     year: Optional[int] = None
     available: bool = True
+    search_vector: Optional[str] = Field(
+        default=None, sa_column=Column(TSVECTOR, Computed(BOOK_SEARCH_VECTOR, persisted=True))
+    )
 
     owner: Optional[User] = Relationship(back_populates="books")
     genre: Optional["Genre"] = Relationship(back_populates="books")
@@ -34,13 +68,18 @@ class Book(SQLModel, table=True):
 
 class Genre(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    name: str
+    name: str = Field(unique=True, index=True)
 
     books: List[Book] = Relationship(back_populates="genre")
     users: List["UserGenre"] = Relationship(back_populates="genre")
 
 
 class UserGenre(SQLModel, table=True):
+    # Кто любит жанр сильнее всех - для подбора обменов, NULL в конце
+    __table_args__ = (
+        Index("ix_usergenre_genre_level", "genre_id", text("preference_level DESC NULLS LAST"), "user_id"),
+    )
+
     user_id: int = Field(foreign_key="user.id", primary_key=True)
     genre_id: int = Field(foreign_key="genre.id", primary_key=True)
     preference_level: Optional[int] = None
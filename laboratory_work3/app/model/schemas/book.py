@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -33,4 +33,27 @@ class GenreSimple(BaseModel):
 class BookRead(BookBase):
     id: int
     owner_id: int
+    source_url: Optional[str] = None
     genre: Optional[GenreSimple] = None
+
+
+class BookPage(BaseModel):
+    items: List[BookRead]
+    next_cursor: Optional[int] = None
+
+
+class BookSearchPage(BaseModel):
+    items: List[BookRead]
+    next_cursor: Optional[str] = None
+
+
+class BookSuggestion(BaseModel):
+    id: int
+    title: str
+    author: Optional[str] = None
+
+
+class BookAutocomplete(BaseModel):
+    items: List[BookSuggestion]
+    # Запрос не уложился в бюджет времени, подсказок нет
+    timed_out: bool = False
@@ -25,3 +25,13 @@ class ExchangeRequestRead(BaseModel):
     status: ExchangeStatus
     message: Optional[str] = None
     created_at: datetime
+
+
+class ExchangeSuggestion(BaseModel):
+    """Взаимный обмен: их книга в жанре, который нравится мне, за мою - в жанре, который нравится им"""
+    user_id: int
+    their_book: BookRead
+    my_book: BookRead
+    their_level: int
+    my_level: int
+    score: int
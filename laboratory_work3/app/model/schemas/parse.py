@@ -1,5 +1,10 @@
-from pydantic import BaseModel
+from typing import Optional
+
+from pydantic import BaseModel, Field
 
 
 class ParseRequest(BaseModel):
-    url: str
\ No newline at end of file
+    url: str
+    max_pages: int = Field(default=1, ge=1, le=1000)
+    # Не задана - парсер возьмёт CRAWL_MAX_DEPTH, если max_pages > 1
+    max_depth: Optional[int] = Field(default=None, ge=0, le=20)
@@ -0,0 +1,81 @@
+import os
+from typing import Optional, Tuple
+
+from sqlalchemy import func, literal, or_, tuple_
+from sqlmodel import select
+
+from model.models.models import Book
+from model.schemas.book import BookRead
+from repos.load_options import load_options
+
+search_vector = Book.__table__.c.search_vector
+# Сколько совпадений поиска ранжировать, не больше
+SEARCH_RANK_LIMIT = int(os.getenv("SEARCH_RANK_LIMIT", 2000))
+
+
+def parse_search_cursor(cursor: str) -> Tuple[float, int]:
+    """Курсор поиска - "ранг:id" последней книги предыдущей страницы"""
+    rank, book_id = cursor.split(":")
+    return float(rank), int(book_id)
+
+
+async def search_books(session, q: str, limit: int, cursor: Optional[str] = None):
+    """Полнотекстовый поиск: книги по убыванию ранга, при равном ранге - по убыванию id.
+
+    Запрос разбирается в обеих конфигурациях, совпадения ищутся по GIN-индексу
+    ix_book_search_vector. Ранжируются только SEARCH_RANK_LIMIT самых новых
+    совпадений: для частого слова иначе пришлось бы считать и сортировать ранг
+    для заметной части таблицы. Набор кандидатов детерминирован (по id), поэтому
+    курсор между страницами остаётся корректным.
+    Возвращает (книги, курсор следующей страницы или None).
+    """
+    query = func.websearch_to_tsquery("russian", q).op("||")(func.websearch_to_tsquery("english", q))
+    matches = (
+        select(Book.id, search_vector)
+        .where(search_vector.op("@@")(query))
+        .order_by(Book.id.desc())
+        .limit(SEARCH_RANK_LIMIT)
+        .subquery("matches")
+    )
+    rank = func.ts_rank_cd(matches.c.search_vector, query).label("rank")
+    statement = (
+        select(Book, rank)
+        .join(matches, Book.id == matches.c.id)
+        .options(*load_options(BookRead))
+    )
+    if cursor is not None:
+        # ts_rank_cd возвращает real; float Python хранит его точно, поэтому сравнение кортежей корректно
+        statement = statement.where(tuple_(rank, Book.id) < tuple_(*parse_search_cursor(cursor)))
+
+    # Берём на одну запись больше, чтобы понять, есть ли следующая страница
+    rows = (await session.exec(statement.order_by(rank.desc(), Book.id.desc()).limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        last_book, last_rank = rows[limit - 1]
+        next_cursor = f"{last_rank!r}:{last_book.id}"
+    return [book for book, _ in rows[:limit]], next_cursor
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def autocomplete_books(session, q: str, limit: int, budget_ms: int):
+    """Подсказки по началу названия или нечёткому совпадению слов в названии и авторе.
+
+    Все три условия обслуживают триграммные GIN-индексы. Сначала идут книги,
+    название которых начинается с q, затем - по убыванию word_similarity.
+    statement_timeout ограничивает запрос budget_ms миллисекундами до конца транзакции.
+    """
+    await session.exec(select(func.set_config("statement_timeout", str(budget_ms), True)))
+    prefix = _escape_like(q) + "%"
+    is_prefix = Book.title.ilike(prefix)
+    # greatest пропускает NULL, так что книги без автора ранжируются по названию
+    score = func.greatest(func.word_similarity(q, Book.title), func.word_similarity(q, Book.author))
+    statement = (
+        select(Book.id, Book.title, Book.author)
+        .where(or_(is_prefix, literal(q).op("<%")(Book.title), literal(q).op("<%")(Book.author)))
+        .order_by(is_prefix.desc(), score.desc(), Book.id)
+        .limit(limit)
+    )
+    return [{"id": id_, "title": title, "author": author} for id_, title, author in (await session.exec(statement)).all()]
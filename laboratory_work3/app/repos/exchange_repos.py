@@ -0,0 +1,97 @@
+from sqlalchemy import func, true
+from sqlmodel import select
+
+from model.models.models import Book, UserGenre
+from model.schemas.book import BookRead
+from repos.load_options import load_options
+
+
+def _level():
+    # Жанр без уровня предпочтения всё равно считается интересным, но ниже любого с уровнем
+    return func.coalesce(UserGenre.preference_level, 0).label("level")
+
+
+def suggestions_query(user_id: int, limit: int, fanout: int):
+    """Один запрос с подбором взаимных обменов для user_id.
+
+    Кандидаты - не больше fanout самых заинтересованных пользователей на каждый
+    жанр, в котором у user_id есть доступная книга (ix_usergenre_genre_level).
+    Для каждого кандидата одной пробой по ix_book_available_owner_genre ищется его
+    доступная книга в жанре, который нравится user_id. Объём работы не зависит
+    от числа пользователей: жанры user_id * fanout кандидатов.
+    """
+    my_offer = (
+        select(Book.genre_id)
+        .where(Book.owner_id == user_id, Book.available, Book.genre_id.is_not(None))
+        .distinct()
+        .cte("my_offer")
+    )
+    my_likes = select(UserGenre.genre_id, _level()).where(UserGenre.user_id == user_id).cte("my_likes")
+
+    interested = (
+        select(UserGenre.user_id, UserGenre.genre_id, _level())
+        .where(UserGenre.genre_id == my_offer.c.genre_id, UserGenre.user_id != user_id)
+        .order_by(UserGenre.preference_level.desc().nulls_last(), UserGenre.user_id)
+        .limit(fanout)
+        .lateral("interested")
+    )
+    # Кандидат мог попасть в выборку по нескольким жанрам - оставляем самый любимый
+    candidates = (
+        select(interested.c.user_id, interested.c.genre_id, interested.c.level)
+        .select_from(my_offer.join(interested, true()))
+        .distinct(interested.c.user_id)
+        .order_by(interested.c.user_id, interested.c.level.desc(), interested.c.genre_id)
+        .cte("candidates")
+    )
+
+    their_book = (
+        select(Book.id.label("book_id"), my_likes.c.level)
+        .join(my_likes, Book.genre_id == my_likes.c.genre_id)
+        .where(Book.owner_id == candidates.c.user_id, Book.available)
+        .order_by(my_likes.c.level.desc(), Book.id)
+        .limit(1)
+        .lateral("their_book")
+    )
+    my_book = (
+        select(Book.id)
+        .where(Book.owner_id == user_id, Book.available, Book.genre_id == candidates.c.genre_id)
+        .order_by(Book.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    score = (candidates.c.level + their_book.c.level).label("score")
+    return (
+        select(
+            candidates.c.user_id,
+            their_book.c.book_id.label("their_book_id"),
+            my_book.label("my_book_id"),
+            candidates.c.level.label("their_level"),
+            their_book.c.level.label("my_level"),
+            score,
+        )
+        .select_from(candidates.join(their_book, true()))
+        .order_by(score.desc(), candidates.c.user_id)
+        .limit(limit)
+    )
+
+
+async def find_suggestions(session, user_id: int, limit: int, fanout: int):
+    """Лучшие взаимные обмены по сумме уровней предпочтения обеих сторон"""
+    rows = (await session.exec(suggestions_query(user_id, limit, fanout))).all()
+    if not rows:
+        return []
+    # Книги для ответа - одним запросом на всю страницу
+    book_ids = {row.their_book_id for row in rows} | {row.my_book_id for row in rows}
+    statement = select(Book).where(Book.id.in_(book_ids)).options(*load_options(BookRead))
+    books = {book.id: book for book in (await session.exec(statement)).unique().all()}
+    return [
+        {
+            "user_id": row.user_id,
+            "their_book": books[row.their_book_id],
+            "my_book": books[row.my_book_id],
+            "their_level": row.their_level,
+            "my_level": row.my_level,
+            "score": row.score,
+        }
+        for row in rows
+    ]
@@ -0,0 +1,62 @@
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+
+from model.models.models import Book, ExchangeRequest, User, UserGenre
+from model.schemas.book import BookRead
+from model.schemas.exchange_request import ExchangeRequestRead
+from model.schemas.user import UserRead
+from model.schemas.user_genre import UserGenreRead
+
+
+# Связи "многие к одному" подтягиваем JOIN-ом в том же запросе,
+# коллекции - отдельным SELECT ... WHERE id IN (...) на всю страницу
+def _book_read(path=None):
+    genre = path.joinedload(Book.genre) if path else joinedload(Book.genre)
+    return [genre]
+
+
+def _user_read(path=None):
+    if path is None:
+        return [
+            selectinload(User.books),
+            selectinload(User.sent_requests),
+            selectinload(User.received_requests),
+        ]
+    return [
+        path.selectinload(User.books),
+        path.selectinload(User.sent_requests),
+        path.selectinload(User.received_requests),
+    ]
+
+
+def _exchange_request_read():
+    options = []
+    for user_rel in (ExchangeRequest.sender, ExchangeRequest.receiver):
+        options += _user_read(joinedload(user_rel))
+    for book_rel in (ExchangeRequest.sender_book, ExchangeRequest.receiver_book):
+        options += _book_read(joinedload(book_rel))
+    return options
+
+
+def _user_genre_read():
+    return [joinedload(UserGenre.genre)]
+
+
+_OPTIONS_BY_SCHEMA = {
+    BookRead: _book_read,
+    UserRead: _user_read,
+    ExchangeRequestRead: _exchange_request_read,
+    UserGenreRead: _user_genre_read,
+}
+
+
+def load_options(schema):
+    """Опции eager-загрузки связей, которые нужны для сериализации в schema"""
+    return _OPTIONS_BY_SCHEMA[schema]()
+
+
+async def reload(session, obj, schema):
+    """Перечитывает объект после commit вместе со связями, нужными schema"""
+    return await session.get(
+        type(obj), inspect(obj).identity, options=load_options(schema), populate_existing=True
+    )
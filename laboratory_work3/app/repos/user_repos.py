@@ -1,17 +1,17 @@
-from sqlmodel import select, Session
+from sqlmodel import select
 
 from model.models.models import User
-from db.connection import engine
+from db.connection import async_session
 
 
-def select_all_users():
-    with Session(engine) as session:
+async def select_all_users():
+    async with async_session() as session:
         statement = select(User)
-        res = session.exec(statement).all()
+        res = (await session.exec(statement)).all()
         return res
 
 
-def find_user(email: str):
-    with Session(engine) as session:
+async def find_user(email: str):
+    async with async_session() as session:
         statement = select(User).where(User.email == email)
-        return session.exec(statement).first()
+        return (await session.exec(statement)).first()
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Без этих переменных db.connection не соберёт адрес БД при импорте
+for name, value in (("DB_USER", "postgres"), ("DB_PASSWORD", "postgres"), ("DB_HOST", "localhost"),
+                    ("DB_PORT", "5432"), ("DB_NAME", "postgres")):
+    os.environ.setdefault(name, value)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
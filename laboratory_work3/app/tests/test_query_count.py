@@ -0,0 +1,114 @@
+"""Списки книг, пользователей и заявок читаются фиксированным числом SELECT.
+
+Если схеме ответа понадобится связь, которой нет в load_options, асинхронная
+сессия упадёт на ленивой загрузке (MissingGreenlet), а синхронная - начнёт
+делать по запросу на строку. Тест ловит оба случая.
+
+Нужен Postgres из переменных DB_*; без него тест пропускается. Таблицы
+создаются в отдельной схеме (schema_translate_map) внутри транзакции,
+которая откатывается, так что данные рабочей базы не мешают.
+Запуск из каталога app:
+    python -m pytest tests
+"""
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from db.connection import engine, get_session
+from main import app
+from model.models.models import Book, ExchangeRequest, Genre, User
+
+TEST_SCHEMA = "query_count_test"
+# Основной запрос + по одному на каждую коллекцию из load_options
+EXPECTED_SELECTS = {
+    "/books/": 1,
+    "/users": 4,
+    "/requests/": 7,
+}
+
+
+async def seed(session, pairs):
+    """pairs пар пользователей: у каждого книга, первый из пары отправил заявку второму"""
+    genre = Genre(name="Фантастика")
+    session.add(genre)
+    await session.flush()
+    for i in range(pairs):
+        sender = User(name=f"sender {i}", email=f"sender{i}@example.com", password="x")
+        receiver = User(name=f"receiver {i}", email=f"receiver{i}@example.com", password="x")
+        session.add_all([sender, receiver])
+        await session.flush()
+        sender_book = Book(owner_id=sender.id, title=f"Книга {i}", author="Автор", genre_id=genre.id)
+        receiver_book = Book(owner_id=receiver.id, title=f"Книга {i}б", author="Автор", genre_id=genre.id)
+        session.add_all([sender_book, receiver_book])
+        await session.flush()
+        session.add(ExchangeRequest(
+            sender_id=sender.id, receiver_id=receiver.id,
+            sender_book_id=sender_book.id, receiver_book_id=receiver_book.id,
+        ))
+    await session.commit()
+
+
+async def count_selects(pairs):
+    """{путь: число SELECT} для списков при pairs парах пользователей"""
+    try:
+        conn = await engine.connect()
+    except (OSError, DBAPIError) as e:
+        pytest.skip(f"Postgres недоступен: {e}")
+
+    selects = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    sessions = async_sessionmaker(
+        bind=conn, class_=AsyncSession, expire_on_commit=False, join_transaction_mode="create_savepoint"
+    )
+
+    async def override_session():
+        async with sessions() as session:
+            yield session
+
+    transaction = await conn.begin()
+    try:
+        await conn.execute(text(f"CREATE SCHEMA {TEST_SCHEMA}"))
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        # Все таблицы без явной схемы - в тестовой: и DDL с проверкой существования,
+        # и запись, и запросы эндпоинтов. search_path для этого не годится - create_all
+        # нашёл бы таблицы public и ничего не создал
+        await conn.execution_options(schema_translate_map={None: TEST_SCHEMA})
+        await conn.run_sync(SQLModel.metadata.create_all)
+        async with sessions() as session:
+            await seed(session, pairs)
+
+        app.dependency_overrides[get_session] = override_session
+        counts = {}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for path in EXPECTED_SELECTS:
+                selects.clear()
+                event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+                try:
+                    response = await client.get(path)
+                finally:
+                    event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+                assert response.status_code == 200, response.text
+                counts[path] = len(selects)
+        return counts
+    finally:
+        app.dependency_overrides.pop(get_session, None)
+        await transaction.rollback()
+        await conn.close()
+        await engine.dispose()
+
+
+@pytest.mark.parametrize("pairs", [1, 10])
+def test_list_endpoints_issue_fixed_number_of_selects(pairs):
+    counts = asyncio.run(count_selects(pairs))
+    assert counts == EXPECTED_SELECTS
@@ -1,7 +1,5 @@
+# Стартовые страницы жанров: остальные страницы выдачи (?page=N) парсер
+# находит сам при обходе с max_pages > 1
 urls = [
     "https://www.litres.ru/genre/samorazvitiye-lichnostnyy-rost-5253/",
-    "https://www.litres.ru/genre/samorazvitiye-lichnostnyy-rost-5253/?page=3",
-    "https://www.litres.ru/genre/samorazvitiye-lichnostnyy-rost-5253/?page=2",
-    "https://www.litres.ru/genre/samorazvitiye-lichnostnyy-rost-5253/?page=4",
-    "https://www.litres.ru/genre/samorazvitiye-lichnostnyy-rost-5253/?page=5",
 ]
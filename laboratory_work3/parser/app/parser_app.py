@@ -1,28 +1,47 @@
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 
-from .parser_service import parse_and_save
-from common.connection import init_db
-from common.parse import ParseRequest
+from .parser_service import shutdown_parse_pool
+from .parser_worker import start_workers, stop_workers
+from common.connection import engine, init_db
+from common.engine_config import pool_stats
+from common.http_session import close_http_session, open_http_session
+from common.jobs import enqueue_job, get_job
+from common.parse import ParseRequest, ParseJobRead
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
+    await open_http_session()
+    workers = start_workers()
     yield
+    await stop_workers(workers)
+    shutdown_parse_pool()
+    await close_http_session()
 
 
 app = FastAPI(lifespan=lifespan)
 
-@app.post("/parse")
+
+@app.get("/metrics/db-pool")
+async def db_pool_metrics():
+    return pool_stats(engine.pool)
+
+
+@app.post("/parse", status_code=202, response_model=ParseJobRead)
 async def parse_url(parse_request: ParseRequest):
-    try:
-        print(f"Parsing URL: {parse_request.url}")
-        await parse_and_save(parse_request.url)
-        return {"message": "Parsing completed"}
-    except Exception as e:
-        print(f"Error in parse_url: {e}")
-        import traceback
-        traceback.print_exc()
-        return {"error": str(e)}
\ No newline at end of file
+    print(f"Queued URL: {parse_request.url}")
+    return await asyncio.to_thread(
+        enqueue_job, parse_request.url, parse_request.max_pages, parse_request.max_depth
+    )
+
+
+@app.get("/parse/{job_id}", response_model=ParseJobRead)
+async def get_parse_job(job_id: int):
+    job = await asyncio.to_thread(get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Parse job not found")
+    return job
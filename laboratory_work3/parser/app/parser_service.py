@@ -1,39 +1,84 @@
-import aiohttp
-from bs4 import BeautifulSoup
-
-
-from common.db import save_books, save_books_async
-
+import asyncio
+import os
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 
-async def fetch(session, url):
-    async with session.get(url, timeout=10, ssl=False) as response:
-        text = await response.text()
-        return url, text
+import aiohttp
 
+from common.db import save_books_async
+from common.extractors import get_extractor
+from common.fetch_policy import check_status, fetch_policy_from_env
+from common.http_session import get_http_session
+from common.page_cache import page_cache_from_env
 
-async def parse_and_save(url):
-    async with aiohttp.ClientSession() as session:
-        url, html = await fetch(session, url)
-        if html:
-            process_page_async(html)
+PARSE_PROCESSES = int(os.getenv("PARSER_PROCESSES", os.cpu_count() or 1))
+_parse_pool = None
+page_cache = page_cache_from_env()
+fetch_policy = fetch_policy_from_env()
+# Временные сетевые ошибки, после которых запрос стоит повторить
+RETRY_ON = (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)
 
 
-def extract_text(tag, default=""):
-    return tag.text.strip() if tag else default
+def get_parse_pool():
+    """Пул процессов для разбора HTML: разбор держит GIL и блокировал бы event loop"""
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(max_workers=PARSE_PROCESSES)
+    return _parse_pool
 
 
-def extract_attr(tag, attr, default=None):
-    return tag[attr] if tag and tag.has_attr(attr) else default
+def shutdown_parse_pool():
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(cancel_futures=True)
+        _parse_pool = None
 
 
-def parse_links_as_books(html):
-    soup = BeautifulSoup(html, "html.parser")
+async def fetch(session, url):
+    """(url, html, modified); при 304 html берётся из кэша, а modified = False.
+
+    429/5xx и таймауты повторяются по fetch_policy, при неудаче бросается исключение.
+    Валидаторы новой страницы попадают в кэш только через ingesting(url).
+    """
+    timeout = aiohttp.ClientTimeout(total=fetch_policy.timeout)
+
+    async def attempt():
+        headers = page_cache.conditional_headers(url) if page_cache else {}
+        async with session.get(url, timeout=timeout, ssl=False, headers=headers) as response:
+            if response.status == 304 and page_cache:
+                page_cache.touch(url)
+                return url, page_cache.get_body(url), False
+            check_status(url, response.status, response.headers)
+            text = await response.text()
+            if page_cache:
+                page_cache.stage(url, text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            return url, text, True
+
+    return await fetch_policy.call_async(url, attempt, retry_on=RETRY_ON)
+
+
+@contextmanager
+def ingesting(url):
+    """Страница запоминается в кэше, только если блок (разбор и запись) прошёл без ошибки"""
+    try:
+        yield
+    except BaseException:
+        if page_cache:
+            page_cache.discard(url)
+        raise
+    if page_cache:
+        page_cache.commit(url)
+
+
+async def fetch_page(url):
+    url, html, modified = await fetch(get_http_session(), url)
+    return html, modified
+
+
+def parse_links_as_books(html, extractor=None):
     books = []
 
-    for a_tag in soup.select("a[href]"):
-        title = extract_text(a_tag)
-        href = extract_attr(a_tag, "href")
-
+    for href, title in get_extractor(extractor).links(html):
         if not href or not title:
             continue
 
@@ -43,6 +88,7 @@ def parse_links_as_books(html):
                 "title": title,
                 "author": "Unknown",
                 "description": full_url,
+                "source_url": full_url,
                 "year": None,
                 "genre_name": "General"
             })
@@ -50,26 +96,15 @@ def parse_links_as_books(html):
     return books
 
 
-def process_page(html, url=""):
-    print(f"[INFO] Обрабатывается: {url}")
-    books_data = parse_links_as_books(html)
-    if books_data:
-        save_books(books_data)
-    else:
-        print("[INFO] Книжные ссылки не найдены.")
-
-
-def process_page_async(html, url=""):
+async def process_page_async(html, url=""):
     print(f"[INFO] Обрабатывается: {url}")
-    books_data = parse_links_as_books(html)
+    loop = asyncio.get_running_loop()
+    books_data = await loop.run_in_executor(get_parse_pool(), parse_links_as_books, html)
     print(f"[INFO] Найдено книг: {len(books_data)}")
     if books_data:
-        try:
-            save_books_async(books_data)
-            print(f"[INFO] Сохранено книг: {len(books_data)}")
-        except Exception as e:
-            print(f"[ERROR] Ошибка при сохранении книг: {e}")
-            import traceback
-            traceback.print_exc()
+        # Ошибку сохранения не глушим: её запишет в задачу воркер
+        await save_books_async(books_data)
+        print(f"[INFO] Сохранено книг: {len(books_data)}")
     else:
         print("[INFO] Книжные ссылки не найдены.")
+    return len(books_data)
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import traceback
+
+from .parser_service import fetch_page, get_parse_pool, ingesting, process_page_async
+from common.crawler import Crawler
+from common.jobs import claim_job, update_job
+from common.models import ParseJobStatus
+
+WORKERS = int(os.getenv("PARSER_WORKERS", 4))
+POLL_INTERVAL = float(os.getenv("PARSER_POLL_INTERVAL", 1))
+
+
+async def run_crawl(job):
+    print(f"[JOB {job.id}] Обход {job.url}: до {job.max_pages} страниц, глубина {job.max_depth}")
+    books_found = 0
+
+    async def on_page(url, html):
+        nonlocal books_found
+        with ingesting(url):
+            books_found += await process_page_async(html, url)
+
+    async def on_progress():
+        # Пульс после каждой страницы, иначе долгий обход неизменившихся страниц
+        # превысит PARSER_JOB_TIMEOUT и задачу заберёт второй воркер
+        await asyncio.to_thread(
+            update_job, job.id, ParseJobStatus.fetching,
+            books_found=books_found, pages_done=crawler.pages_done,
+        )
+
+    crawler = Crawler(
+        fetch_page, on_page, max_pages=job.max_pages, max_depth=job.max_depth, executor=get_parse_pool(),
+        on_progress=on_progress,
+    )
+    stats = await crawler.run([job.url])
+    error = f"Не удалось загрузить страниц: {stats['failed']}" if stats["failed"] else None
+    await asyncio.to_thread(
+        update_job, job.id, ParseJobStatus.done,
+        books_found=books_found, pages_done=stats["pages"], error=error,
+    )
+    print(f"[JOB {job.id}] Готово, страниц: {stats['pages']}, книг: {books_found}")
+
+
+async def run_job(job):
+    if job.max_pages > 1:
+        return await run_crawl(job)
+
+    print(f"[JOB {job.id}] Парсинг {job.url}")
+    html, modified = await fetch_page(job.url)
+    if not modified:
+        # Страница не менялась с прошлого раза, книги из неё уже сохранены
+        await asyncio.to_thread(update_job, job.id, ParseJobStatus.done, books_found=0)
+        print(f"[JOB {job.id}] Страница не изменилась")
+        return
+    with ingesting(job.url):
+        await asyncio.to_thread(update_job, job.id, ParseJobStatus.saving)
+        books_found = await process_page_async(html, job.url) if html else 0
+    await asyncio.to_thread(update_job, job.id, ParseJobStatus.done, books_found=books_found)
+    print(f"[JOB {job.id}] Готово, книг: {books_found}")
+
+
+async def worker_loop(worker_id):
+    while True:
+        try:
+            job = await asyncio.to_thread(claim_job)
+        except Exception as e:
+            print(f"[WORKER {worker_id}] Не удалось получить задачу: {e}")
+            await asyncio.sleep(POLL_INTERVAL)
+            continue
+        if job is None:
+            await asyncio.sleep(POLL_INTERVAL)
+            continue
+
+        try:
+            await run_job(job)
+        except Exception as e:
+            print(f"[JOB {job.id}] Ошибка: {e}")
+            traceback.print_exc()
+            try:
+                await asyncio.to_thread(update_job, job.id, ParseJobStatus.failed, error=str(e))
+            except Exception as update_error:
+                # БД недоступна - задача останется "в работе" и после JOB_TIMEOUT
+                # вернётся в очередь; сам воркер должен жить дальше
+                print(f"[JOB {job.id}] Не удалось записать ошибку: {update_error}")
+                await asyncio.sleep(POLL_INTERVAL)
+
+
+def start_workers():
+    return [asyncio.create_task(worker_loop(i)) for i in range(WORKERS)]
+
+
+async def stop_workers(workers):
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
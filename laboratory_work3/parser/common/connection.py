@@ -1,22 +1,28 @@
 import os
-from datetime import time
+import time
 
 from dotenv import load_dotenv
+from sqlalchemy import text
 from sqlalchemy.exc import OperationalError
 from sqlmodel import SQLModel, Session, create_engine
 
+from common.engine_config import engine_options
+
 load_dotenv()
 
 db_url = (
     f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
     f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
 )
-engine = create_engine(db_url, echo=True)
+engine = create_engine(db_url, **engine_options(db_url))
 
 
 def init_db():
     for i in range(10):
         try:
+            with engine.begin() as conn:
+                # Триграммные индексы Book (автодополнение) требуют расширения pg_trgm
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
             SQLModel.metadata.create_all(engine)
             break
         except OperationalError as e:
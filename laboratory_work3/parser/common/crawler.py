@@ -0,0 +1,136 @@
+import asyncio
+import os
+import time
+from urllib.parse import parse_qs, urlencode, urldefrag, urljoin, urlsplit, urlunsplit
+
+from common.extractors import get_extractor
+
+MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", 50))
+MAX_DEPTH = int(os.getenv("CRAWL_MAX_DEPTH", 3))
+CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", 8))
+PER_HOST_CONCURRENCY = int(os.getenv("CRAWL_PER_HOST_CONCURRENCY", 2))
+POLITENESS_DELAY = float(os.getenv("CRAWL_DELAY", 0.5))
+
+
+def normalize_url(url):
+    """Убирает якорь и ?page=1, чтобы одна страница не попадала во фронтир дважды"""
+    url, _ = urldefrag(url)
+    parts = urlsplit(url)
+    query = parse_qs(parts.query)
+    if query.get("page") == ["1"]:
+        del query["page"]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path or "/", urlencode(query, doseq=True), ""))
+
+
+def discover_links(html, page_url, follow_books=False, extractor=None):
+    """Ссылки для обхода: другие страницы той же выдачи (?page=N) и, по желанию, карточки книг"""
+    page = urlsplit(page_url)
+    found = []
+    for href, _ in get_extractor(extractor).links(html):
+        url = normalize_url(urljoin(page_url, href))
+        parts = urlsplit(url)
+        if parts.netloc != page.netloc:
+            continue
+        if parts.path == page.path and "page" in parse_qs(parts.query):
+            found.append(url)
+        elif follow_books and "/book/" in parts.path:
+            found.append(url)
+    return found
+
+
+class Crawler:
+    """Обход сайта от стартовых URL с дедуплицированным фронтиром.
+
+    fetch(url) возвращает (html, modified): по неизменившейся странице ссылки
+    всё равно ищутся, но on_page для неё не вызывается. on_progress(), если
+    задан, вызывается после каждой страницы - и новой, и неизменившейся, и
+    неудачной.
+
+    Одновременно выполняется не больше concurrency загрузок, на один хост -
+    не больше per_host, и между началами запросов к хосту проходит не меньше
+    delay секунд. Обход ограничен max_pages страницами и глубиной max_depth.
+    """
+
+    def __init__(self, fetch, on_page, max_pages=MAX_PAGES, max_depth=MAX_DEPTH,
+                 concurrency=CONCURRENCY, per_host=PER_HOST_CONCURRENCY, delay=POLITENESS_DELAY,
+                 follow_books=False, executor=None, on_progress=None):
+        self.fetch = fetch
+        self.on_page = on_page
+        self.on_progress = on_progress
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.delay = delay
+        self.follow_books = follow_books
+        self.executor = executor
+
+        self.seen = set()
+        self.pages_done = 0
+        self.failed = {}
+        self._frontier = asyncio.Queue()
+        self._host_slots = {}
+        self._host_locks = {}
+        self._host_last_request = {}
+
+    def _schedule(self, url, depth):
+        url = normalize_url(url)
+        if url in self.seen or depth > self.max_depth or len(self.seen) >= self.max_pages:
+            return
+        self.seen.add(url)
+        self._frontier.put_nowait((url, depth))
+
+    async def _polite_fetch(self, url):
+        host = urlsplit(url).netloc
+        slots = self._host_slots.setdefault(host, asyncio.Semaphore(self.per_host))
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        async with slots:
+            async with lock:
+                wait = self._host_last_request.get(host, 0) + self.delay - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._host_last_request[host] = time.monotonic()
+            return await self.fetch(url)
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            url, depth = await self._frontier.get()
+            try:
+                await self._visit(loop, url, depth)
+                if self.on_progress:
+                    await self.on_progress()
+            except Exception as e:
+                # Ошибка отчёта не должна останавливать обход
+                print(f"[CRAWL] Ошибка отчёта о прогрессе: {e}")
+            finally:
+                self._frontier.task_done()
+
+    async def _visit(self, loop, url, depth):
+        try:
+            html, modified = await self._polite_fetch(url)
+            if html:
+                if depth < self.max_depth:
+                    links = await loop.run_in_executor(
+                        self.executor, discover_links, html, url, self.follow_books
+                    )
+                    for link in links:
+                        self._schedule(link, depth + 1)
+                if modified:
+                    await self.on_page(url, html)
+            self.pages_done += 1
+        except Exception as e:
+            print(f"[CRAWL] Ошибка на {url}: {e}")
+            self.failed[url] = str(e)
+
+    async def run(self, seeds):
+        for url in seeds:
+            self._schedule(url, 0)
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        try:
+            await self._frontier.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        return {"pages": self.pages_done, "failed": len(self.failed), "discovered": len(self.seen)}
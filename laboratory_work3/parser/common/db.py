@@ -1,9 +1,16 @@
-from typing import Optional
+import asyncio
+import os
+from typing import Dict
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlmodel import select
 
 from common.connection import get_session
 from common.models import Genre, Book, User
 
+BATCH_SIZE = int(os.getenv("PARSER_BATCH_SIZE", 1000))
+
 
 def get_or_create_default_user(session) -> int:
     """Создает пользователя по умолчанию, если его нет"""
@@ -17,51 +24,84 @@ def get_or_create_default_user(session) -> int:
             password="default_password"
         )
         session.add(user)
+        session.flush()
+        # id задан явно - сдвигаем последовательность, иначе первая регистрация получит id=1
+        sequence = func.pg_get_serial_sequence('"user"', "id")
+        session.exec(select(func.setval(sequence, select(func.max(User.id)).scalar_subquery())))
         session.commit()
         session.refresh(user)
     return user.id
 
 
+def get_genre_ids(session, genre_names) -> Dict[str, int]:
+    """Карта имя жанра -> id; недостающие жанры создаются одним INSERT ... ON CONFLICT.
 
+    Задачи парсера сохраняют книги параллельно, и две первые пачки могут
+    одновременно создавать один жанр. DO UPDATE вместо DO NOTHING нужен, чтобы
+    RETURNING вернул id и жанра, который успела создать другая задача. Имена
+    отсортированы, чтобы параллельные пачки брали блокировки в одном порядке.
+    """
+    names = {name for name in genre_names if name}
+    if not names:
+        return {}
 
-def get_or_create_genre(session, genre_name: str) -> Optional[int]:
-    if not genre_name:
-        return None
-
-    statement = select(Genre).where(Genre.name == genre_name)
-    genre = session.exec(statement).first()
-    if not genre:
-        genre = Genre(name=genre_name)
-        session.add(genre)
-        session.commit()
-        session.refresh(genre)
-    return genre.id
+    statement = select(Genre.name, Genre.id).where(Genre.name.in_(names))
+    genre_ids = dict(session.exec(statement).all())
+    missing = sorted(names - genre_ids.keys())
+    if missing:
+        upsert = pg_insert(Genre).values([{"name": name} for name in missing])
+        upsert = upsert.on_conflict_do_update(index_elements=[Genre.name], set_={"name": upsert.excluded.name})
+        genre_ids.update(session.execute(upsert.returning(Genre.name, Genre.id)).tuples().all())
+    return genre_ids
 
 
-
-
-def save_books(books_data):
+def save_books(books_data, batch_size=BATCH_SIZE):
     print(f"[DB] Начинаем сохранение {len(books_data)} книг")
     with next(get_session()) as session:
         try:
             # Создаем пользователя по умолчанию
             owner_id = get_or_create_default_user(session)
             print(f"[DB] Используем пользователя с ID: {owner_id}")
-            
-            for data in books_data:
-                genre_id = get_or_create_genre(session, data["genre_name"]) if data["genre_name"] else 1
-
-                book = Book(
-                    title=data["title"],
-                    author=data["author"],
-                    description=data["description"],
-                    year=data["year"],
-                    genre_id=genre_id,
-                    owner_id=owner_id
-                )
-                session.add(book)
-                print(f"[DB] Добавлена книга: {data['title']}")
+
+            genre_ids = get_genre_ids(session, (data["genre_name"] for data in books_data))
             session.commit()
+
+            # Одна ссылка на книгу часто встречается на странице несколько раз,
+            # а ON CONFLICT DO UPDATE не может обновить строку дважды за запрос
+            unique_books = {}
+            for data in books_data:
+                unique_books.setdefault(data["source_url"], data)
+            books_data = list(unique_books.values())
+
+            upsert = pg_insert(Book)
+            upsert = upsert.on_conflict_do_update(
+                index_elements=[Book.source_url],
+                set_={
+                    "title": upsert.excluded.title,
+                    "author": upsert.excluded.author,
+                    "description": upsert.excluded.description,
+                    "year": upsert.excluded.year,
+                    "genre_id": upsert.excluded.genre_id,
+                },
+            )
+
+            # Каждая пачка - один INSERT ... VALUES ... ON CONFLICT и одна транзакция
+            for i in range(0, len(books_data), batch_size):
+                rows = [
+                    {
+                        "title": data["title"],
+                        "author": data["author"],
+                        "description": data["description"],
+                        "source_url": data["source_url"],
+                        "year": data["year"],
+                        "genre_id": genre_ids[data["genre_name"]] if data["genre_name"] else 1,
+                        "owner_id": owner_id,
+                        "available": True,
+                    }
+                    for data in books_data[i:i + batch_size]
+                ]
+                session.execute(upsert, rows)
+                session.commit()
             print(f"[DB] Успешно сохранено {len(books_data)} книг")
         except Exception as e:
             print(f"[DB ERROR] Ошибка при сохранении: {e}")
@@ -70,6 +110,8 @@ def save_books(books_data):
             session.rollback()
             raise
 
-def save_books_async(books_data):
-    """Синхронная версия для совместимости"""
-    save_books(books_data)
+
+async def save_books_async(books_data):
+    """save_books в пуле потоков, чтобы запись в БД не блокировала event loop"""
+    await asyncio.to_thread(save_books, books_data)
+
@@ -0,0 +1,92 @@
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlmodel import Session, or_, select, update
+
+from common.connection import engine
+from common.models import ParseJob, ParseJobStatus
+
+# Задача в работе, которая слишком долго не обновлялась (воркер упал), снова выдаётся воркерам
+JOB_TIMEOUT = timedelta(seconds=int(os.getenv("PARSER_JOB_TIMEOUT", 600)))
+IN_PROGRESS = (ParseJobStatus.fetching, ParseJobStatus.saving)
+# Сколько раз задачу можно выдать воркерам; задача, которая каждый раз роняет воркер, не крутится вечно
+MAX_ATTEMPTS = int(os.getenv("PARSER_MAX_ATTEMPTS", 3))
+
+
+def enqueue_job(url: str, max_pages: int = 1, max_depth: int = 0) -> ParseJob:
+    with Session(engine) as session:
+        job = ParseJob(url=url, max_pages=max_pages, max_depth=max_depth)
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+        return job
+
+
+def get_job(job_id: int) -> Optional[ParseJob]:
+    with Session(engine) as session:
+        return session.get(ParseJob, job_id)
+
+
+def fail_exhausted_jobs(session, stale_before):
+    """Зависшие задачи, у которых кончились попытки, помечаются failed вместо повторной выдачи"""
+    now = datetime.now()
+    session.execute(
+        update(ParseJob)
+        .where(
+            ParseJob.status.in_(IN_PROGRESS),
+            ParseJob.updated_at < stale_before,
+            ParseJob.attempts >= MAX_ATTEMPTS,
+        )
+        .values(
+            status=ParseJobStatus.failed,
+            error=f"Воркер не завершил задачу за {MAX_ATTEMPTS} попыток",
+            updated_at=now,
+            finished_at=now,
+        )
+    )
+    session.commit()
+
+
+def claim_job() -> Optional[ParseJob]:
+    """Забирает следующую задачу; SKIP LOCKED не даёт двум воркерам взять одну и ту же"""
+    with Session(engine) as session:
+        stale_before = datetime.now() - JOB_TIMEOUT
+        fail_exhausted_jobs(session, stale_before)
+        statement = (
+            select(ParseJob)
+            .where(or_(
+                ParseJob.status == ParseJobStatus.queued,
+                ParseJob.status.in_(IN_PROGRESS)
+                & (ParseJob.updated_at < stale_before)
+                & (ParseJob.attempts < MAX_ATTEMPTS),
+            ))
+            .order_by(ParseJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job = session.exec(statement).first()
+        if job is None:
+            return None
+        job.status = ParseJobStatus.fetching
+        job.started_at = job.updated_at = datetime.now()
+        job.attempts += 1
+        session.commit()
+        session.refresh(job)
+        return job
+
+
+def update_job(job_id: int, status: ParseJobStatus, books_found=None, pages_done=None, error=None):
+    with Session(engine) as session:
+        job = session.get(ParseJob, job_id)
+        job.status = status
+        job.updated_at = datetime.now()
+        if books_found is not None:
+            job.books_found = books_found
+        if pages_done is not None:
+            job.pages_done = pages_done
+        if error is not None:
+            job.error = error
+        if status in (ParseJobStatus.done, ParseJobStatus.failed):
+            job.finished_at = datetime.now()
+        session.commit()
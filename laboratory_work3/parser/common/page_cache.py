@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+EVICT_EVERY = 50
+
+
+class PageCache:
+    """Дисковый кэш страниц по URL для условных запросов (ETag / Last-Modified).
+
+    На каждый URL два файла: <sha1>.html с телом и <sha1>.json с заголовками.
+    Запись идёт через временный файл и os.replace, поэтому кэш можно делить
+    между потоками и процессами. Старые записи удаляются по возрасту, затем
+    самые давно использованные - пока кэш не уложится в max_bytes.
+
+    Загруженная страница сначала откладывается в памяти (stage) и попадает
+    на диск только после commit - когда её книги сохранены. Поэтому 304
+    означает "страница уже загружена в БД", а не просто "уже скачана".
+    """
+
+    def __init__(self, directory, max_bytes, max_age):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._stores = 0
+        # url -> (тело, etag, last_modified) страниц, которые ещё обрабатываются
+        self._staged = {}
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode()).hexdigest()
+        return self.directory / f"{key}.html", self.directory / f"{key}.json"
+
+    def _meta(self, url):
+        body_path, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if time.time() - meta["stored_at"] > self.max_age or not body_path.exists():
+            return None
+        return meta
+
+    def conditional_headers(self, url):
+        meta = self._meta(url)
+        if meta is None:
+            return {}
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def get_body(self, url):
+        body_path, _ = self._paths(url)
+        try:
+            body = body_path.read_text(encoding="utf-8")
+            os.utime(body_path)
+        except OSError:
+            return None
+        return body
+
+    def _write(self, path, text):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as tmp:
+            tmp.write(text)
+        os.replace(tmp_path, path)
+
+    def store(self, url, body, etag=None, last_modified=None):
+        if not etag and not last_modified:
+            # Без валидаторов сервер всё равно не ответит 304
+            return
+        body_path, meta_path = self._paths(url)
+        self._write(body_path, body)
+        self._write(meta_path, json.dumps({
+            "url": url, "etag": etag, "last_modified": last_modified, "stored_at": time.time(),
+        }))
+        self._stores += 1
+        if self._stores % EVICT_EVERY == 0:
+            self.evict()
+
+    def stage(self, url, body, etag=None, last_modified=None):
+        if etag or last_modified:
+            self._staged[url] = (body, etag, last_modified)
+
+    def commit(self, url):
+        """Страница обработана и сохранена - записываем её валидаторы"""
+        staged = self._staged.pop(url, None)
+        if staged is not None:
+            self.store(url, *staged)
+
+    def discard(self, url):
+        """Обработка не удалась - в следующий раз страница скачается целиком"""
+        self._staged.pop(url, None)
+
+    def touch(self, url):
+        """Ответ 304: страница актуальна, продлеваем срок записи"""
+        meta = self._meta(url)
+        if meta is not None:
+            body_path, meta_path = self._paths(url)
+            meta["stored_at"] = time.time()
+            self._write(meta_path, json.dumps(meta))
+            try:
+                os.utime(body_path)
+            except FileNotFoundError:
+                pass
+
+    def evict(self):
+        now = time.time()
+        entries = []
+        for meta_path in self.directory.glob("*.json"):
+            body_path = meta_path.with_suffix(".html")
+            try:
+                stat = body_path.stat()
+                stored_at = json.loads(meta_path.read_text(encoding="utf-8"))["stored_at"]
+            except (OSError, ValueError, KeyError):
+                self._remove(meta_path, body_path)
+                continue
+            if now - stored_at > self.max_age:
+                self._remove(meta_path, body_path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, meta_path, body_path))
+
+        total = sum(size for _, size, _, _ in entries)
+        for _, size, meta_path, body_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(meta_path, body_path)
+            total -= size
+
+    @staticmethod
+    def _remove(*paths):
+        for path in paths:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def page_cache_from_env():
+    directory = os.getenv("PAGE_CACHE_DIR", ".page_cache")
+    if not directory:
+        return None
+    return PageCache(
+        directory,
+        max_bytes=int(os.getenv("PAGE_CACHE_MAX_MB", 200)) * 1024 * 1024,
+        max_age=int(os.getenv("PAGE_CACHE_MAX_AGE", 7 * 24 * 3600)),
+    )
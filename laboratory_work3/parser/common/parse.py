@@ -1,5 +1,35 @@
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+from common.crawler import MAX_DEPTH
+from common.models import ParseJobStatus
 
 
 class ParseRequest(BaseModel):
-    url: str
\ No newline at end of file
+    url: str
+    max_pages: int = Field(default=1, ge=1, le=1000)
+    max_depth: Optional[int] = Field(default=None, ge=0, le=20)
+
+    @model_validator(mode="after")
+    def default_depth(self):
+        # С глубиной 0 обход не найдёт ни одной ссылки, и max_pages ничего бы не значил
+        if self.max_depth is None:
+            self.max_depth = MAX_DEPTH if self.max_pages > 1 else 0
+        return self
+
+
+class ParseJobRead(BaseModel):
+    id: int
+    url: str
+    max_pages: int
+    max_depth: int
+    status: ParseJobStatus
+    pages_done: Optional[int] = None
+    books_found: Optional[int] = None
+    error: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -1,24 +1,11 @@
-from bs4 import BeautifulSoup
-
 from common.db import save_books_async, save_books
+from common.extractors import get_extractor
 
 
-def extract_text(tag, default=""):
-    return tag.text.strip() if tag else default
-
-
-def extract_attr(tag, attr, default=None):
-    return tag[attr] if tag and tag.has_attr(attr) else default
-
-
-def parse_links_as_books(html):
-    soup = BeautifulSoup(html, "html.parser")
+def parse_links_as_books(html, extractor=None):
     books = []
 
-    for a_tag in soup.select("a[href]"):
-        title = extract_text(a_tag)
-        href = extract_attr(a_tag, "href")
-
+    for href, title in get_extractor(extractor).links(html):
         if not href or not title:
             continue
 
@@ -28,6 +15,7 @@ def parse_links_as_books(html):
                 "title": title,
                 "author": "—",
                 "description": full_url,
+                "source_url": full_url,
                 "year": None,
                 "genre_name": None
             })
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Тесты не ходят в БД, но common.connection создаёт движок при импорте
+for name, value in (("DB_USER", "test"), ("DB_PASSWORD", "test"), ("DB_HOST", "localhost"),
+                    ("DB_PORT", "5432"), ("DB_NAME", "test")):
+    os.environ.setdefault(name, value)
+os.environ.setdefault("PAGE_CACHE_DIR", "")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
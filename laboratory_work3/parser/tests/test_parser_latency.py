@@ -0,0 +1,78 @@
+"""Параллельные задачи /parse должны перекрываться, а не идти друг за другом.
+
+Блокирующие части обработки - разбор HTML и синхронная запись в БД -
+заменены на time.sleep, а путь, которым они уводятся с event loop
+(пул процессов для разбора, asyncio.to_thread для записи), остаётся
+настоящим. Если что-то из этого снова начнёт выполняться прямо в event
+loop, две задачи займут сумму своих времён, а не максимум. Postgres не нужен.
+
+Запуск из каталога parser:
+    python -m pytest tests
+"""
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+import common.db
+from app import parser_service, parser_worker
+
+DELAY = 0.3
+
+
+async def slow_fetch_page(url):
+    await asyncio.sleep(DELAY)
+    return "<html></html>", True
+
+
+def blocking_parse(html, extractor=None):
+    time.sleep(DELAY)
+    return [{"title": "Книга", "genre_name": "General"}]
+
+
+def blocking_save_books(books_data):
+    time.sleep(DELAY)
+
+
+@pytest.fixture
+def slow_io(monkeypatch):
+    monkeypatch.setattr(parser_service, "fetch_page", slow_fetch_page)
+    monkeypatch.setattr(parser_worker, "fetch_page", slow_fetch_page)
+    monkeypatch.setattr(parser_service, "parse_links_as_books", blocking_parse)
+    monkeypatch.setattr(common.db, "save_books", blocking_save_books)
+    monkeypatch.setattr(parser_worker, "update_job", lambda *args, **kwargs: None)
+    # Два процесса разбора даже на одноядерной машине; fork - чтобы дочерние
+    # процессы видели подменённую функцию разбора
+    pool = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("fork"))
+    monkeypatch.setattr(parser_service, "_parse_pool", pool)
+    # Процессы запускаются заранее, чтобы их старт не попал в замер
+    list(pool.map(time.sleep, [0, 0]))
+    yield
+    pool.shutdown()
+
+
+def wall_time(*coroutines):
+    async def run():
+        start = time.perf_counter()
+        await asyncio.gather(*coroutines)
+        return time.perf_counter() - start
+    return asyncio.run(run())
+
+
+def test_process_page_async_overlaps(slow_io):
+    elapsed = wall_time(
+        parser_service.process_page_async("<html></html>", "http://a"),
+        parser_service.process_page_async("<html></html>", "http://b"),
+    )
+    # Разбор + запись: последовательно было бы 4 * DELAY
+    assert elapsed < 3 * DELAY
+
+
+def test_run_job_overlaps(slow_io):
+    jobs = [SimpleNamespace(id=i, url=f"http://site/{i}", max_pages=1, max_depth=0) for i in (1, 2)]
+    elapsed = wall_time(*(parser_worker.run_job(job) for job in jobs))
+    # Загрузка + разбор + запись: последовательно было бы 6 * DELAY
+    assert elapsed < 3.5 * DELAY